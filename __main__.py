@@ -1,14 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import datetime
 import logging
+import random
+import subprocess
 import sys
+from time import perf_counter
+from typing import TYPE_CHECKING
 
 import aiohttp
 import click
 
 from bot import IrenesBot, setup_logging
 from utils.database import create_pool
+from utils.migrations import apply_migrations
+
+if TYPE_CHECKING:
+    import asyncpg
+
+    from ext.dota.sessions import SessionAggregate
 
 try:
     import uvloop  # type: ignore
@@ -30,6 +41,14 @@ async def start_the_bot() -> None:
         log.exception("Could not set up PostgreSQL. Exiting.")
         return
 
+    try:
+        await apply_migrations(pool)
+    except Exception:
+        click.echo("Could not apply database migrations. Exiting.", file=sys.stderr)
+        log.exception("Could not apply database migrations. Exiting.")
+        await pool.close()
+        return
+
     async with (
         aiohttp.ClientSession() as session,
         pool as pool,
@@ -38,17 +57,179 @@ async def start_the_bot() -> None:
         await irenesbot.start()
 
 
+async def benchmark_sessions(row_counts: tuple[int, ...], repeat: int) -> None:
+    """Time the latest gaming session detection: `LAG()` query vs fetching all matches and walking them in Python."""
+    # imported here so other commands and the bot launch do not load the dota extension
+    from ext.dota.enums import PlayerMatchOutcome, WinLossCategory
+    from ext.dota.sessions import SESSION_GAP, SessionAggregate, fetch_latest_session
+
+    async def python_path(connection: asyncpg.Connection[asyncpg.Record], account_id: int) -> SessionAggregate | None:
+        # the way `!wl` used to do it
+        query = """
+            SELECT game_mode, lobby_type, outcome, start_time
+            FROM ttv_dota_matches
+            WHERE account_id = $1 AND outcome IN ($2, $3)
+            ORDER BY start_time DESC
+        """
+        games = await connection.fetch(query, account_id, PlayerMatchOutcome.Loss.value, PlayerMatchOutcome.Win.value)
+        session_games: list[asyncpg.Record] = []
+        for game in games:
+            if session_games and session_games[-1]["start_time"] - game["start_time"] > SESSION_GAP:
+                break
+            session_games.append(game)
+        if not session_games:
+            return None
+
+        session = SessionAggregate(session_games[-1]["start_time"])
+        for game in reversed(session_games):
+            category = WinLossCategory.create(game["lobby_type"], game["game_mode"])
+            session.add(category, PlayerMatchOutcome(game["outcome"]), game["start_time"])
+        return session
+
+    def synthetic_matches(account_id: int, count: int) -> list[tuple[int, int, int, int, int, datetime.datetime, int]]:
+        # a match every ~40 minutes with a long break every dozen matches or so
+        rng = random.Random(count)
+        start_time = datetime.datetime.now(datetime.UTC)
+        matches = []
+        for match_id in range(count, 0, -1):
+            lobby_type, game_mode = rng.choice([(7, 22), (0, 22), (0, 23)])  # ranked/unranked all pick, turbo
+            outcome = rng.choices([0, 1, 21], weights=[48, 48, 4])[0]
+            matches.append((match_id, account_id, rng.randint(1, 138), game_mode, lobby_type, start_time, outcome))
+            gap = datetime.timedelta(hours=rng.uniform(7, 30)) if rng.random() < 0.08 else None
+            start_time -= gap or datetime.timedelta(minutes=rng.uniform(25, 60))
+        return matches
+
+    paths = {"sql (LAG)": fetch_latest_session, "python": python_path}
+    async with await create_pool() as pool, pool.acquire() as connection:
+        for count in row_counts:
+            # everything is rolled back, so the benchmark never touches real data
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                account_id = -count  # negative ids don't clash with real accounts
+                query = "INSERT INTO ttv_dota_streamers (account_id, twitch_id, twitch_name) VALUES ($1, '0', 'bench')"
+                await connection.execute(query, account_id)
+                await connection.copy_records_to_table(
+                    "ttv_dota_matches",
+                    records=synthetic_matches(account_id, count),
+                    columns=("match_id", "account_id", "hero_id", "game_mode", "lobby_type", "start_time", "outcome"),
+                )
+                await connection.execute("ANALYZE ttv_dota_matches")
+
+                click.echo(f"\n{count} matches, best of {repeat}:")
+                # compared as data, not as rendered responses - the order of categories differs between the paths
+                results: dict[str, tuple[object, ...] | None] = {}
+                for name, path in paths.items():
+                    best = float("inf")
+                    for _ in range(repeat):
+                        start = perf_counter()
+                        session = await path(connection, account_id)
+                        best = min(best, perf_counter() - start)
+                    results[name] = (
+                        (session.session_start, session.last_match_time, session.results) if session else None
+                    )
+                    click.echo(f"{name:>12}: {best * 1000:>9.2f} ms")
+                sql_result, python_result = results.values()
+                if sql_result != python_result:
+                    click.echo(f"Paths disagree: {results}", err=True)
+            finally:
+                await transaction.rollback()
+
+
 @click.group(invoke_without_command=True, options_metavar="[options]")
+@click.option("--json-logs", is_flag=True, help="Also write structured JSON lines logs into `.temp/irenesbot.jsonl`.")
 @click.pass_context
-def main(click_ctx: click.Context) -> None:
+def main(click_ctx: click.Context, json_logs: bool) -> None:
     """Launches the bot."""
     if click_ctx.invoked_subcommand is None:
-        with setup_logging():
+        with setup_logging(json_logs=json_logs):
             try:
                 asyncio.run(start_the_bot())
             except KeyboardInterrupt:
                 print("Aborted! The bot was interrupted with `KeyboardInterrupt`!")  # noqa: T201
 
 
+@main.command(name="importtime")
+@click.option("--top", default=20, show_default=True, help="Amount of the slowest modules to show.")
+@click.option("--extensions/--no-extensions", default=True, help="Whether to include enabled extensions.")
+def import_time(top: int, extensions: bool) -> None:
+    """Report what the bot spends its startup import time on.
+
+    Imports the bot (and its enabled extensions) in a fresh interpreter with `python -X importtime`.
+    """
+    code = "import bot, utils.database"
+    if extensions:
+        code += "; import importlib, ext; [importlib.import_module(e) for e in ext.EXTENSIONS]"
+    code += "; import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    # lines look like "import time:       123 |        456 |     some.module"
+    modules: list[tuple[int, int, str]] = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+    if process.returncode and not process.stdout.strip():
+        # most likely `resource` module (Unix only) or some import failed
+        click.echo(process.stderr.splitlines()[-1] if process.stderr else "Failed to import the bot.", err=True)
+
+    # top-level imports (no indentation) sum up to the whole import time
+    total = sum(cumulative for _, cumulative, name in modules if not name.startswith("  ", 1))
+    click.echo(f"Total import time: {total / 1000:.1f} ms ({len(modules)} modules)")
+    if max_rss := process.stdout.strip():
+        click.echo(f"Max RSS: {int(max_rss) / 1024:.1f} MB")
+
+    click.echo(f"\nTop {top} by cumulative time:")
+    for self_us, cumulative_us, name in sorted(modules, key=lambda row: row[1], reverse=True)[:top]:
+        click.echo(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>9.1f} ms  {name.strip()}")
+
+
+@main.command(name="migrate")
+@click.option("--dry-run", is_flag=True, help="Only list pending migrations without applying them.")
+def migrate(dry_run: bool) -> None:
+    """Apply pending database migrations from `sql/migrations/`.
+
+    The bot applies them on start as well, so this is mostly for deploying schema changes ahead of time.
+    """
+
+    async def run() -> None:
+        async with await create_pool() as pool:
+            migrations = await apply_migrations(pool, dry_run=dry_run)
+        if not migrations:
+            click.echo("The database is up to date.")
+        for migration in migrations:
+            click.echo(f"{'Pending' if dry_run else 'Applied'}: {migration.path.name}")
+
+    with setup_logging():
+        asyncio.run(run())
+
+
+@main.command(name="benchsessions")
+@click.option(
+    "--rows",
+    "row_counts",
+    multiple=True,
+    type=int,
+    default=(10_000, 100_000),
+    show_default=True,
+    help="Amount of synthetic matches to benchmark with, can be repeated.",
+)
+@click.option("--repeat", default=5, show_default=True, help="Runs per path, the best one is reported.")
+def bench_sessions(row_counts: tuple[int, ...], repeat: int) -> None:
+    """Compare gaming session detection for `!wl` in SQL against Python.
+
+    Synthetic matches are inserted in a transaction that is rolled back afterwards, so the database is left as it was.
+    """
+    asyncio.run(benchmark_sessions(row_counts, repeat))
+
+
 if __name__ == "__main__":
     main()
@@ -1,3 +1,7 @@
 from .bases import *
 from .bot import *
+from .channels import *
 from .logs import *
+from .metrics import *
+from .pipeline import *
+from .subscriptions import *
@@ -30,8 +30,9 @@ class IrenesComponent(commands.Component):
         """Get Irene's channel from the cache."""
         return self.bot.create_partialuser(const.UserID.Irene)
 
-    async def deliver(self, content: str) -> None:
-        await self.irene.send_message(
+    async def deliver(self, content: str, *, broadcaster_id: str = const.UserID.Irene) -> None:
+        """Send a message into the channel (Irene's one by default)."""
+        await self.bot.create_partialuser(broadcaster_id).send_message(
             sender=self.bot.bot_id,
             message=content,
         )
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import datetime
+import functools
 import logging
+import math
+import time as time_
 from collections.abc import Callable, Coroutine, Sequence
 from typing import TYPE_CHECKING, Any, Protocol, TypeVar, override
 
@@ -8,9 +13,9 @@ import discord
 from discord.ext import tasks
 from discord.utils import MISSING
 
-if TYPE_CHECKING:
-    import datetime
+from ..metrics import metrics
 
+if TYPE_CHECKING:
     from ..bot import IrenesBot
 
     class HasBotAttribute(Protocol):
@@ -19,17 +24,145 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
-__all__ = ("irenes_loop",)
+__all__ = (
+    "irenes_loop",
+    "task_registry",
+)
 
 
 _func = Callable[..., Coroutine[Any, Any, Any]]
 LF = TypeVar("LF", bound=_func)
+T = TypeVar("T")
+
+
+class LoopStats:
+    """Scheduler telemetry of one loop instance.
+
+    Attributes
+    ----------
+    iterations
+        Amount of finished calls (both scheduled iterations and direct calls).
+    overruns
+        Amount of scheduled iterations that took longer than the loop's interval.
+    coalesced
+        Amount of scheduled slots dropped because an overrunning iteration already ate their time.
+    joined
+        Amount of calls that didn't start a new run but waited for the one in progress instead.
+    skipped
+        Amount of calls that were skipped because a run was already in progress.
+    last_duration, max_duration
+        Duration of iterations in seconds.
+    last_lateness, max_lateness
+        How late (in seconds) scheduled iterations started compared to their scheduled time.
+    """
+
+    __slots__: tuple[str, ...] = (
+        "coalesced",
+        "iterations",
+        "joined",
+        "last_duration",
+        "last_lateness",
+        "max_duration",
+        "max_lateness",
+        "overruns",
+        "skipped",
+    )
+
+    def __init__(self) -> None:
+        self.iterations: int = 0
+        self.overruns: int = 0
+        self.coalesced: int = 0
+        self.joined: int = 0
+        self.skipped: int = 0
+        self.last_duration: float = 0.0
+        self.max_duration: float = 0.0
+        self.last_lateness: float = 0.0
+        self.max_lateness: float = 0.0
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"<LoopStats iterations={self.iterations} overruns={self.overruns} coalesced={self.coalesced} "
+            f"max_duration={self.max_duration:.3f} max_lateness={self.max_lateness:.3f}>"
+        )
+
+
+class TaskRegistry:
+    """Registry of all running `IrenesLoop` tasks.
+
+    * gives a global view of what is running and who owns it (`!tasks` command);
+    * caps the amount of running tasks per category (see `irenes_loop(max_tasks=...)`),
+        so tasks leaked by i.e. never reset matches can't pile up;
+    * helps to make sure tasks of an unloaded extension are cancelled (see `IrenesBot.cancel_component_tasks`).
+    """
+
+    def __init__(self) -> None:
+        self.running: dict[IrenesLoop[Any], asyncio.Task[None]] = {}
+        self.limits: dict[str, int] = {}  # category -> max running tasks
+
+    def set_limit(self, category: str, limit: int) -> None:
+        self.limits[category] = limit
+
+    def check_limit(self, loop: IrenesLoop[Any]) -> None:
+        """Make sure the loop can start a task without going over its category's limit.
+
+        Raises
+        ------
+        RuntimeError
+            The category already runs as many tasks as allowed.
+        """
+        limit = self.limits.get(loop.category)
+        if limit is None or loop in self.running:
+            # (re)starting an already registered loop doesn't add a task
+            return
+        running = sum(1 for other in self.running if other.category == loop.category)
+        if running >= limit:
+            msg = f"Not starting {loop.raw_coro.__qualname__}: {loop.category!r} already runs {running}/{limit} tasks."
+            raise RuntimeError(msg)
+
+    def register(self, loop: IrenesLoop[Any], task: asyncio.Task[None]) -> None:
+        if self.running.get(loop) is task:
+            return
+        self.running[loop] = task
+
+        def unregister(_: asyncio.Task[None]) -> None:
+            # the loop might've been restarted with a new task already
+            if self.running.get(loop) is task:
+                del self.running[loop]
+
+        task.add_done_callback(unregister)
+
+    def owned_by(self, owner: object) -> list[IrenesLoop[Any]]:
+        return [loop for loop in self.running if loop.owner is owner]
+
+    def by_category(self) -> dict[str, list[IrenesLoop[Any]]]:
+        categories: dict[str, list[IrenesLoop[Any]]] = {}
+        for loop in self.running:
+            categories.setdefault(loop.category, []).append(loop)
+        return categories
+
+    def defined_in(self, module: str) -> list[IrenesLoop[Any]]:
+        """Get running loops which functions are defined in the module (or package) and its submodules."""
+        return [
+            loop
+            for loop in self.running
+            if loop.raw_coro.__module__ == module or loop.raw_coro.__module__.startswith(f"{module}.")
+        ]
+
+
+task_registry = TaskRegistry()
 
 
 class IrenesLoop(tasks.Loop[LF]):
     """My subclass for discord.ext.tasks.Loop.
 
-    Just extra boilerplate functionality.
+    Extra functionality:
+    * errors are sent to `exc_manager`;
+    * scheduler telemetry in `stats` and `metrics`: iteration duration, overruns, lateness of scheduled iterations;
+    * `coalesce` (default): a slow iteration never stacks up behind itself - missed slots are dropped
+        and calls made while the loop is busy wait for the current run instead of starting another one;
+    * `skip_if_busy`: calls made while the loop is busy are skipped altogether;
+    * running tasks are tracked in `task_registry` and respect its per-category limits.
 
     Flavour note
     ------------
@@ -57,8 +190,28 @@ class IrenesLoop(tasks.Loop[LF]):
         count: int | None,
         reconnect: bool,
         name: str | None,
+        *,
+        coalesce: bool = True,
+        skip_if_busy: bool = False,
+        category: str | None = None,
+        max_tasks: int | None = None,
     ) -> None:
-        super().__init__(coro, seconds, hours, minutes, time, count, reconnect, name)
+        self.raw_coro: LF = coro
+        self.coalesce: bool = coalesce
+        self.skip_if_busy: bool = skip_if_busy
+        self.category: str = category or coro.__qualname__
+        if max_tasks is not None:
+            task_registry.set_limit(self.category, max_tasks)
+        self.stats: LoopStats = LoopStats()
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+
+        @functools.wraps(coro)
+        async def scheduled_iteration(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(args, kwargs, scheduled=True)
+
+        super().__init__(scheduled_iteration, seconds, hours, minutes, time, count, reconnect, name)  # type: ignore[arg-type]
+
     #     self._before_loop = self._base_before_loop
 
     # async def _base_before_loop(self, cog: HasBotAttribute) -> None:  # *args: Any
@@ -75,6 +228,131 @@ class IrenesLoop(tasks.Loop[LF]):
     #     """
     #     await cog.bot.wait_for_ready()
 
+    @override
+    def __get__(self, obj: T, objtype: type[T]) -> IrenesLoop[LF]:
+        # same as the parent's but it makes `IrenesLoop` copies instead of plain `Loop` ones,
+        # otherwise all the features below would be lost for loops defined in classes.
+        if obj is None:
+            return self
+
+        copy: IrenesLoop[LF] = IrenesLoop(
+            self.raw_coro,
+            seconds=self._seconds,
+            hours=self._hours,
+            minutes=self._minutes,
+            time=self._time,
+            count=self.count,
+            reconnect=self.reconnect,
+            name=self._name,
+            coalesce=self.coalesce,
+            skip_if_busy=self.skip_if_busy,
+            category=self.category,
+        )
+        copy._injected = obj
+        copy._before_loop = self._before_loop
+        copy._after_loop = self._after_loop
+        copy._error = self._error
+        setattr(obj, self.raw_coro.__name__, copy)
+        return copy
+
+    @override
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._injected is not None:
+            args = (self._injected, *args)
+        return await self._run(args, kwargs, scheduled=False)
+
+    @property
+    def owner(self) -> object | None:
+        """Object the loop is bound to (i.e. the component or the `Player`)."""
+        return self._injected
+
+    @override
+    def start(self, *args: Any, **kwargs: Any) -> asyncio.Task[None]:
+        task_registry.check_limit(self)
+        task = super().start(*args, **kwargs)
+        task_registry.register(self, task)
+        return task
+
+    @override
+    async def _loop(self, *args: Any, **kwargs: Any) -> None:
+        # registering from within the task covers every way it gets (re)created, i.e. `restart()`,
+        # while `start()` above registers right away so the task is visible before its first tick
+        if (task := asyncio.current_task()) is not None:
+            task_registry.register(self, task)
+        await super()._loop(*args, **kwargs)
+
+    @property
+    def is_busy(self) -> bool:
+        """Whether the loop's coroutine is being executed right now (either as an iteration or a direct call)."""
+        return not self._idle.is_set()
+
+    async def _run(self, args: tuple[Any, ...], kwargs: dict[str, Any], *, scheduled: bool) -> Any:
+        """Run the coroutine, collecting the telemetry.
+
+        If the previous run is still in progress, the call doesn't start a second one:
+        * with `skip_if_busy` it returns immediately;
+        * with `coalesce` it waits for the in-progress run to finish instead.
+        """
+        name = self.raw_coro.__qualname__
+        if self.is_busy:
+            if self.skip_if_busy:
+                self.stats.skipped += 1
+                metrics.counter("irenesbot_loop_skipped_total", name=name).inc()
+                log.debug("Loop %s is busy, skipping the call.", name)
+                return None
+            if self.coalesce:
+                self.stats.joined += 1
+                metrics.counter("irenesbot_loop_joined_total", name=name).inc()
+                await self._idle.wait()
+                return None
+
+        if scheduled and self._last_iteration is not MISSING and not self._last_iteration_failed:
+            lateness = max(0.0, (discord.utils.utcnow() - self._last_iteration).total_seconds())
+            self.stats.last_lateness = lateness
+            self.stats.max_lateness = max(self.stats.max_lateness, lateness)
+            metrics.histogram("irenesbot_loop_lateness_seconds", name=name).observe(lateness)
+
+        self._idle.clear()
+        start = time_.perf_counter()
+        try:
+            with metrics.timer("loop", name):
+                return await self.raw_coro(*args, **kwargs)
+        finally:
+            duration = time_.perf_counter() - start
+            self.stats.iterations += 1
+            self.stats.last_duration = duration
+            self.stats.max_duration = max(self.stats.max_duration, duration)
+            if scheduled:
+                self._handle_overrun(duration)
+            self._idle.set()
+
+    def _handle_overrun(self, duration: float) -> None:
+        """Account for an iteration that took longer than the interval.
+
+        The parent class schedules iterations relative to the previous *scheduled* time,
+        so after an overrun it would fire the missed iterations back-to-back to catch up.
+        With `coalesce` the missed slots are dropped and the next iteration is moved to the first slot in the future.
+        """
+        if not self._is_relative_time() or self._next_iteration is None:
+            return
+        interval = self._sleep
+        if interval <= 0 or duration <= interval:
+            return
+
+        name = self.raw_coro.__qualname__
+        self.stats.overruns += 1
+        metrics.counter("irenesbot_loop_overruns_total", name=name).inc()
+        log.debug("Loop %s overran its %.1fs interval: %.3fs", name, interval, duration)
+
+        if not self.coalesce:
+            return
+        behind = (discord.utils.utcnow() - self._next_iteration).total_seconds()
+        if behind > 0:
+            missed = math.ceil(behind / interval)
+            self._next_iteration += datetime.timedelta(seconds=missed * interval)
+            self.stats.coalesced += missed
+            metrics.counter("irenesbot_loop_coalesced_total", name=name).inc(missed)
+
     @override
     async def _error(self, cog: HasBotAttribute, exception: Exception) -> None:
         """Same `_error` as in parent class but with `exc_manager` integrated."""
@@ -96,6 +374,10 @@ def irenes_loop(
     count: int | None = None,
     reconnect: bool = True,
     name: str | None = None,
+    coalesce: bool = True,
+    skip_if_busy: bool = False,
+    category: str | None = None,
+    max_tasks: int | None = None,
 ) -> Callable[[LF], IrenesLoop[LF]]:
     """Copy-pasted `loop` decorator from `discord.ext.tasks` corresponding to AluLoop class.
 
@@ -103,6 +385,9 @@ def irenes_loop(
     -----
     * if `discord.ext.tasks` gets extra cool features which will be represented in a change of `tasks.loop`
         decorator/signature we would need to manually update this function (or maybe even AluLoop class)
+    * `coalesce` and `skip_if_busy` are `IrenesLoop` extras, read `IrenesLoop._run` for more.
+    * `category` (defaults to the function's qualified name) groups tasks in `task_registry`,
+        `max_tasks` caps the amount of running tasks of the category (`start()` raises `RuntimeError` beyond it).
 
     """
 
@@ -116,6 +401,10 @@ def irenes_loop(
             time=time,
             reconnect=reconnect,
             name=name,
+            coalesce=coalesce,
+            skip_if_busy=skip_if_busy,
+            category=category,
+            max_tasks=max_tasks,
         )
 
     return decorator
@@ -2,26 +2,37 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from typing import TYPE_CHECKING, Any, TypedDict, override
 
 import discord
 import twitchio
-from twitchio import eventsub
 from twitchio.ext import commands
 
 import config
-from ext import EXTENSIONS
+from ext import EXTENSIONS, extension_waves
 from utils import const, errors
-from utils.dota import Dota2Client
 
-from .bases import irenes_loop
+from .bases import irenes_loop, task_registry
+from .channels import ChannelConfig
 from .exc_manager import ExceptionManager
+from .metrics import MetricsServer, metrics
+from .pipeline import MessagePipeline
+from .subscriptions import SubscriptionManager
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
     import asyncpg
     from aiohttp import ClientSession
+    from twitchio.eventsub.websockets import WebsocketClosed
 
     from utils.database import PoolTypedWithAny
+    from utils.dota import Dota2Client, LiveMatchPoller, ProfileCardBatcher
+
+    from .channels import ChannelsRow
+
+    type Listener = Callable[..., Coroutine[Any, Any, None]]
 
     class LoadTokensQueryRow(TypedDict):
         user_id: str
@@ -44,6 +55,9 @@ class IrenesBot(commands.Bot):
 
     if TYPE_CHECKING:
         logs_via_webhook_handler: logging.Handler
+        dota: Dota2Client
+        profile_cards: ProfileCardBatcher
+        live_matches: LiveMatchPoller
 
     def __init__(
         self,
@@ -72,12 +86,19 @@ class IrenesBot(commands.Bot):
         self.pool: PoolTypedWithAny = pool  # type: ignore # asyncpg typehinting crutch, read `utils.database` for more
         self.session: ClientSession = session
         self.extensions: tuple[str, ...] = EXTENSIONS
+        self.extension_load_times: dict[str, float] = {}
 
         self.exc_manager = ExceptionManager(self)
+        self.message_pipeline = MessagePipeline(self)
+        self.subscriptions = SubscriptionManager(self)
+        self.metrics = metrics
+        self.metrics_server = MetricsServer(metrics)
+        # original listener -> instrumented listener, so `remove_listener` can find the latter
+        self._instrumented_listeners: dict[Listener, Listener] = {}
         self.repo = "https://github.com/Aluerie/Irene_s_Bot"
-        self.dota = Dota2Client(self)
 
-        self.irene_online: bool = False
+        self.channels: dict[str, ChannelConfig] = {const.UserID.Irene: ChannelConfig.irene()}
+        self.online_channels: set[str] = set()
 
     # def show_oauth(self) -> None:
     #     oauth = twitchio.authentication.OAuth(
@@ -137,53 +158,42 @@ class IrenesBot(commands.Bot):
         # self.print_broadcaster_oauth()
         # return
 
-        for ext in self.extensions:
-            await self.load_module(ext)
-
-        # it's just a personal bot :)
-        broadcaster = const.UserID.Irene
-        bot = const.UserID.Bot
-
-        # * TwitchDev Docs:
-        #   Eventsub:   https://dev.twitch.tv/docs/eventsub/eventsub-subscription-types
-        #   Scopes:     https://dev.twitch.tv/docs/authentication/scopes/
-        # * TwitchIO  Docs:
-        #   Events:     https://twitchio.dev/en/dev-3.0/references/events.html
-        #   Models:     https://twitchio.dev/en/dev-3.0/references/eventsub_models.html
-
-        # EventSub Subscriptions Table (order - function name sorted by alphabet).
-        # Subscription Name                     Permission
-        # ------------------------------------------------------
-        # ✅ Ad break begin                        channel:read:ads
-        sub = eventsub.AdBreakBeginSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub, token_for=broadcaster, as_bot=False)
-        # Bans                                  channel:moderate
-        sub = eventsub.ChannelBanSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub, token_for=broadcaster, as_bot=False)
-        # ✅ Follows                               moderator:read:followers
-        sub = eventsub.ChannelFollowSubscription(broadcaster_user_id=broadcaster, moderator_user_id=bot)
-        await self.subscribe_websocket(payload=sub)
-        # ✅ Channel Points Redeem                 channel:read:redemptions or channel:manage:redemptions
-        sub = eventsub.ChannelPointsRedeemAddSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub, token_for=broadcaster, as_bot=False)
-        # ✅ Message                               user:read:chat from the chatting user, channel:bot from broadcaster
-        sub = eventsub.ChatMessageSubscription(broadcaster_user_id=broadcaster, user_id=bot)
-        await self.subscribe_websocket(payload=sub)
-        # Raids to the channel                  No authorization required
-        sub = eventsub.ChannelRaidSubscription(to_broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub)
-        # ✅ Stream went offline                   No authorization required
-        sub = eventsub.StreamOfflineSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub)
-        # ✅ Stream went live                      No authorization required
-        sub = eventsub.StreamOnlineSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub)
-        # ✅ Channel Update (title/game)           No authorization required
-        sub = eventsub.ChannelUpdateSubscription(broadcaster_user_id=broadcaster)
-        await self.subscribe_websocket(payload=sub)
+        await self.metrics_server.start()
+        await self.load_channels()
+        await self.load_extensions()
+
+        await self.subscriptions.subscribe(self.channels)
 
         self.check_if_online.start()
 
+    async def load_extensions(self) -> None:
+        """Load extensions wave by wave, extensions within a wave are loaded concurrently.
+
+        Load time of every extension is stored in `extension_load_times` and logged as a report.
+        """
+
+        async def load(extension: str) -> None:
+            start = time.perf_counter()
+            await self.load_module(extension)
+            self.extension_load_times[extension] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for wave in extension_waves(self.extensions):
+            await asyncio.gather(*(load(ext) for ext in wave))
+
+        report = "\n".join(
+            f"{ext:<30} {seconds:.3f}s"
+            for ext, seconds in sorted(self.extension_load_times.items(), key=lambda item: item[1], reverse=True)
+        )
+        log.info("Loaded %s extensions in %.3fs:\n%s", len(self.extensions), time.perf_counter() - start, report)
+
+    async def load_channels(self) -> None:
+        """Load channels that the bot serves from the database."""
+        query = "SELECT broadcaster_id, name, timers, keywords FROM ttv_channels"
+        rows: list[ChannelsRow] = await self.pool.fetch(query)
+        self.channels |= {row["broadcaster_id"]: ChannelConfig.from_row(row) for row in rows}
+        log.info("Serving channels: %s", ", ".join(channel.name for channel in self.channels.values()))
+
     @override
     async def add_token(self, token: str, refresh: str) -> twitchio.authentication.ValidateTokenPayload:
         # Make sure to call super() as it will add the tokens internally and return us some data...
@@ -216,6 +226,68 @@ class IrenesBot(commands.Bot):
         if "ext.dota" in self.extensions:
             await self.dota.wait_until_ready()
 
+    @override
+    async def add_component(self, component: commands.Component, /) -> None:
+        await super().add_component(component)
+        self.message_pipeline.register_component(component)
+
+    @override
+    async def remove_component(self, name: str, /) -> commands.Component | None:
+        component = await super().remove_component(name)
+        if component:
+            self.message_pipeline.unregister_component(component)
+            self.cancel_component_tasks(component)
+        return component
+
+    def cancel_component_tasks(self, component: commands.Component) -> None:
+        """Cancel `irenes_loop` tasks that belong to the component or its extension.
+
+        Components are supposed to cancel their loops in `component_teardown` but it's easy to forget one,
+        i.e. loops of objects created by the component (like `Player.update`) - a leftover task would keep running
+        the old code of an unloaded/reloaded extension.
+        """
+        module = component.__module__
+        extension = next((ext for ext in self.extensions if module == ext or module.startswith(f"{ext}.")), module)
+        loops = {*task_registry.owned_by(component), *task_registry.defined_in(extension)}
+        for loop in loops:
+            loop.cancel()
+        if loops:
+            log.info("Cancelled %s leftover task(s) of %s component.", len(loops), component.name)
+
+    @override
+    def add_listener(self, listener: Listener, *, event: str | None = None) -> None:
+        # time every listener in `metrics`
+        name = event or listener.__name__
+        instrumented = self.metrics.instrument("listener", f"{name}:{listener.__qualname__}", listener)
+        self._instrumented_listeners[listener] = instrumented
+        super().add_listener(instrumented, event=name)
+
+    @override
+    def remove_listener(self, listener: Listener) -> Listener | None:
+        instrumented = self._instrumented_listeners.pop(listener, listener)
+        return listener if super().remove_listener(instrumented) else None
+
+    @override
+    async def invoke(self, ctx: commands.Context) -> None:
+        start = time.perf_counter()
+        await super().invoke(ctx)
+        elapsed = time.perf_counter() - start
+        if ctx.command:
+            # errors are handled inside the invoke, so we can't rely on `metrics.timer` to count them
+            name = ctx.command.qualified_name
+            self.metrics.histogram(self.metrics.DURATION, kind="command", name=name).observe(elapsed)
+            if ctx.error_dispatched:
+                self.metrics.counter(self.metrics.ERRORS, kind="command", name=name).inc()
+
+    @override
+    async def event_message(self, payload: twitchio.ChatMessage) -> None:
+        # one pass for all chat features (see `bot.pipeline`) alongside usual twitchio commands processing
+        with self.metrics.timer("event", "event_message"):
+            await asyncio.gather(
+                self.message_pipeline.process(payload),
+                super().event_message(payload),
+            )
+
     @override
     async def event_command_error(self, payload: commands.CommandErrorPayload) -> None:
         """Called when error happens during command invoking."""
@@ -316,6 +388,7 @@ class IrenesBot(commands.Bot):
     @override
     async def start(self) -> None:
         if "ext.dota" in self.extensions:
+            self.instantiate_dota()
             await asyncio.gather(
                 super().start(),
                 self.dota.login(),
@@ -323,6 +396,16 @@ class IrenesBot(commands.Bot):
         else:
             await super().start()
 
+    def instantiate_dota(self) -> None:
+        """Initialize Dota 2 Client.
+
+        Only done when `ext.dota` is enabled, so the bot doesn't import `steam` (and all its dependencies) otherwise.
+        """
+        if not hasattr(self, "dota"):
+            from utils.dota import Dota2Client
+
+            self.dota = Dota2Client(self)
+
     async def instantiate_steam_web_api(self) -> None:
         """Initialize Steam Web API client."""
         if not hasattr(self, "steam_web_api"):
@@ -339,6 +422,20 @@ class IrenesBot(commands.Bot):
             self.opendota = OpenDotaClient()
             await self.opendota.__aenter__()
 
+    def instantiate_profile_cards(self) -> None:
+        """Initialize batched Dota 2 profile cards fetcher."""
+        if not hasattr(self, "profile_cards"):
+            from utils.dota import ProfileCardBatcher
+
+            self.profile_cards = ProfileCardBatcher(self)
+
+    def instantiate_live_matches(self) -> None:
+        """Initialize live matches poller."""
+        if not hasattr(self, "live_matches"):
+            from utils.dota import LiveMatchPoller
+
+            self.live_matches = LiveMatchPoller(self)
+
     async def instantiate_cache_dota(self) -> None:
         """Initialize OpenDota client."""
         if not hasattr(self, "cache_dota"):
@@ -348,7 +445,11 @@ class IrenesBot(commands.Bot):
 
     @override
     async def close(self) -> None:
-        await self.dota.close()
+        self.subscriptions.close()
+        await self.metrics_server.close()
+        await self.exc_manager.close()
+        if hasattr(self, "dota"):
+            await self.dota.close()
         await super().close()
 
         for client in (
@@ -377,19 +478,46 @@ class IrenesBot(commands.Bot):
         """Error Role ping used to notify Irene about some errors."""
         return config.ERROR_PING
 
+    @property
+    def irene_online(self) -> bool:
+        return const.UserID.Irene in self.online_channels
+
+    def is_online(self, broadcaster_id: str) -> bool:
+        return broadcaster_id in self.online_channels
+
     async def irene_stream(self) -> twitchio.Stream | None:
-        return next(iter(await self.fetch_streams(user_ids=[const.UserID.Irene])), None)
+        return await self.fetch_stream(const.UserID.Irene)
+
+    async def fetch_stream(self, broadcaster_id: str) -> twitchio.Stream | None:
+        return next(iter(await self.fetch_streams(user_ids=[broadcaster_id])), None)
+
+    def set_online(self, broadcaster_id: str, online: bool) -> None:
+        """Mark the channel online/offline and dispatch corresponding events.
+
+        Dispatches `channel_online`/`channel_offline` with `broadcaster_id` payload for every channel
+        and payload-less `irene_online`/`irene_offline` for Irene's channel.
+        """
+        if online:
+            self.online_channels.add(broadcaster_id)
+        else:
+            self.online_channels.discard(broadcaster_id)
+
+        status = "online" if online else "offline"
+        self.dispatch(f"channel_{status}", broadcaster_id)
+        if broadcaster_id == const.UserID.Irene:
+            self.dispatch(f"irene_{status}")
 
     @irenes_loop(count=1)
     async def check_if_online(self) -> None:
-        if await self.irene_stream():
-            self.irene_online = True
-            self.dispatch("irene_online")
+        for stream in await self.fetch_streams(user_ids=list(self.channels)):
+            self.set_online(stream.user.id, True)
+
+    async def event_stream_online(self, online: twitchio.StreamOnline) -> None:
+        self.set_online(online.broadcaster.id, True)
 
-    async def event_stream_online(self, _: twitchio.StreamOnline) -> None:
-        self.irene_online = True
-        self.dispatch("irene_online")
+    async def event_stream_offline(self, offline: twitchio.StreamOffline) -> None:
+        self.set_online(offline.broadcaster.id, False)
 
-    async def event_stream_offline(self, _: twitchio.StreamOffline) -> None:
-        self.irene_online = False
-        self.dispatch("irene_offline")
+    async def event_websocket_closed(self, _: WebsocketClosed) -> None:
+        # twitchio re-subscribes by itself on reconnect, but it gives up on subscriptions of a socket closed for good
+        self.subscriptions.schedule_resubscribe()
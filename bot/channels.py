@@ -0,0 +1,86 @@
+"""Channels.
+
+The bot can serve several twitch channels from one process.
+Channels and their configuration are stored in `ttv_channels` table,
+while components keep their per-channel state in `PerChannel` containers.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypedDict, override
+
+from utils import const
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    class ChannelsRow(TypedDict):
+        """`ttv_channels` Table Columns."""
+
+        broadcaster_id: str
+        name: str
+        timers: bool
+        keywords: bool
+
+
+__all__ = (
+    "ChannelConfig",
+    "PerChannel",
+)
+
+
+class ChannelConfig:
+    """Per-channel configuration.
+
+    Attributes
+    ----------
+    broadcaster_id
+        Twitch ID of the channel.
+    name
+        Twitch login name of the channel, mostly for logs and convenience.
+    timers
+        Whether periodic timer messages are sent into the channel.
+    keywords
+        Whether the bot reacts to keywords in the channel's chat.
+    """
+
+    __slots__: tuple[str, ...] = ("broadcaster_id", "keywords", "name", "timers")
+
+    def __init__(self, broadcaster_id: str, name: str, *, timers: bool = False, keywords: bool = True) -> None:
+        self.broadcaster_id: str = broadcaster_id
+        self.name: str = name
+        self.timers: bool = timers
+        self.keywords: bool = keywords
+
+    @classmethod
+    def from_row(cls, row: ChannelsRow) -> ChannelConfig:
+        return cls(row["broadcaster_id"], row["name"], timers=row["timers"], keywords=row["keywords"])
+
+    @classmethod
+    def irene(cls) -> ChannelConfig:
+        """Irene's channel with everything enabled. It's her bot after all."""
+        return cls(const.UserID.Irene, const.LowerName.Irene, timers=True, keywords=True)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<ChannelConfig broadcaster_id={self.broadcaster_id} name={self.name}>"
+
+
+class PerChannel[T](dict[str, T]):
+    """Mapping `broadcaster_id -> state` that creates the state on first access.
+
+    Example
+    -------
+    ```py
+    self.states: PerChannel[TimerState] = PerChannel(TimerState)
+    self.states[line.broadcaster_id].lines_count += 1
+    ```
+    """
+
+    def __init__(self, factory: Callable[[str], T]) -> None:
+        super().__init__()
+        self.factory: Callable[[str], T] = factory
+
+    def __missing__(self, broadcaster_id: str) -> T:
+        state = self[broadcaster_id] = self.factory(broadcaster_id)
+        return state
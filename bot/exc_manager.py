@@ -2,76 +2,194 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import hashlib
 import logging
 import traceback
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from collections.abc import Generator
-
-    import discord
+import discord
 
+if TYPE_CHECKING:
     from .bot import IrenesBot
 
 
+__all__ = ("ExceptionManager",)
+
 log = logging.getLogger("exc_manager")
 
 
-class ExceptionManager:
-    """Exception Manager that."""
+def fingerprint(error: BaseException) -> str:
+    """Identify the error by its type and the stack of frames it was raised through.
 
-    __slots__: tuple[str, ...] = (
-        "bot",
-        "cooldown",
-        "errors_cache",
-        "_lock",
-        "_most_recent",
-    )
+    Errors with the same fingerprint are "the same error", i.e. the same failing loop iteration over and over.
+    Messages are ignored on purpose because they often contain ids/timestamps.
+    """
+    frames = traceback.extract_tb(error.__traceback__)
+    stack = "|".join(f"{frame.filename}:{frame.name}:{frame.lineno}" for frame in frames)
+    return hashlib.sha1(f"{type(error).__qualname__}|{stack}".encode(), usedforsecurity=False).hexdigest()[:10]
 
-    def __init__(self, bot: IrenesBot, *, cooldown: datetime.timedelta = datetime.timedelta(seconds=5)) -> None:
-        self.bot: IrenesBot = bot
-        self.cooldown: datetime.timedelta = cooldown
 
-        self._lock: asyncio.Lock = asyncio.Lock()
-        self._most_recent: datetime.datetime | None = None
+class ErrorReport:
+    """Aggregated occurrences of errors with the same fingerprint."""
 
-    def _yield_code_chunks(self, iterable: str, *, chunks_size: int = 2000) -> Generator[str, None, None]:
-        codeblocks: str = "```py\n{}```"
-        max_chars_in_code = chunks_size - (len(codeblocks) - 2)  # chunks_size minus code blocker size
+    __slots__: tuple[str, ...] = (
+        "count",
+        "embed",
+        "error",
+        "fingerprint",
+        "first_seen",
+        "last_seen",
+        "mention",
+        "traceback",
+    )
 
-        for i in range(0, len(iterable), max_chars_in_code):
-            yield codeblocks.format(iterable[i : i + max_chars_in_code])
+    def __init__(self, fingerprint: str, error: BaseException, embed: discord.Embed, *, mention: bool) -> None:
+        self.fingerprint: str = fingerprint
+        self.error: BaseException = error
+        self.embed: discord.Embed = embed
+        self.mention: bool = mention
+        self.count: int = 1
+        self.first_seen: datetime.datetime = datetime.datetime.now(datetime.UTC)
+        self.last_seen: datetime.datetime = self.first_seen
+        self.traceback: str = "".join(traceback.format_exception(error)).replace(str(Path.cwd()), "IrenesBot")
+
+    def embeds(self) -> list[discord.Embed]:
+        """Traceback embed followed by the context embed (the one that was provided to `register_error`)."""
+        codeblocks = "```py\n{}```"
+        # the end of the traceback is the most useful part;
+        # the limit leaves room for the context embed within discord's 6000 characters per message
+        limit = 3500
+        text = self.traceback if len(self.traceback) <= limit else "…" + self.traceback[-limit + 1 :]
+
+        title = type(self.error).__name__
+        if self.count > 1:
+            title += f" \N{MULTIPLICATION SIGN}{self.count}"
+        traceback_embed = discord.Embed(colour=0x890620, title=title, description=codeblocks.format(text))
+        traceback_embed.set_footer(text=f"fingerprint: {self.fingerprint}")
+        if self.count > 1:
+            traceback_embed.timestamp = self.last_seen
+            first, last = (discord.utils.format_dt(dt, "T") for dt in (self.first_seen, self.last_seen))
+            traceback_embed.add_field(name="Occurrences", value=f"{first} - {last}")
+        return [traceback_embed, self.embed]
 
-    async def register_error(self, error: BaseException, embed: discord.Embed, *, mention: bool = True) -> None:
-        """Register, analyse error and put it into queue to send to developers."""
-        log.error("%s: `%s`.", error.__class__.__name__, embed.footer.text, exc_info=error)
-
-        traceback_string = "".join(traceback.format_exception(error)).replace(str(Path.cwd()), "IrenesBot")
 
-        async with self._lock:
-            if self._most_recent and (delta := datetime.datetime.now(datetime.UTC) - self._most_recent) < self.cooldown:
-                # We have to wait
-                total_seconds = delta.total_seconds()
-                log.debug("Waiting %s seconds to send the error.", total_seconds)
-                await asyncio.sleep(total_seconds)
+class ExceptionManager:
+    """Exception Manager that aggregates errors and sends them to the developers.
 
-            self._most_recent = datetime.datetime.now(datetime.UTC)
-            await self.send_error(traceback_string, embed, mention)
+    Errors are fingerprinted (see `fingerprint`) and each fingerprint is aggregated in its own window:
+    the report is held while the same error keeps coming in (at most `window` apart from each other)
+    and is sent once the error goes quiet for `window` or the report gets `max_window` old.
+    Due reports are sent in as few webhook calls as possible with an occurrence count per fingerprint.
+    So a loop failing 30 times in a row results in one report saying "x30" instead of 30 reports.
+    """
 
-    async def send_error(self, traceback: str, embed: discord.Embed, mention: bool) -> None:
-        """Send an error to the webhook.
+    __slots__: tuple[str, ...] = (
+        "_flush_task",
+        "_last_pinged",
+        "bot",
+        "max_window",
+        "pending",
+        "ping_cooldown",
+        "window",
+    )
 
-        It is not recommended to call this yourself, call `register_error` instead.
-        """
+    def __init__(
+        self,
+        bot: IrenesBot,
+        *,
+        window: datetime.timedelta = datetime.timedelta(seconds=30),
+        max_window: datetime.timedelta = datetime.timedelta(minutes=10),
+        ping_cooldown: datetime.timedelta = datetime.timedelta(hours=1),
+    ) -> None:
+        self.bot: IrenesBot = bot
+        # clearly longer than the period of our most frequent loops (10s), so a loop failing every iteration
+        # keeps extending the same report instead of producing one report per iteration
+        self.window: datetime.timedelta = window
+        self.max_window: datetime.timedelta = max_window
+        self.ping_cooldown: datetime.timedelta = ping_cooldown
 
-        code_chunks = list(self._yield_code_chunks(traceback))
+        self.pending: dict[str, ErrorReport] = {}  # fingerprint -> report
+        self._last_pinged: dict[str, datetime.datetime] = {}  # fingerprint -> last time we pinged about it
+        self._flush_task: asyncio.Task[None] | None = None
 
-        if mention:
-            await self.bot.error_webhook.send(self.bot.error_ping)
+    async def register_error(self, error: BaseException, embed: discord.Embed, *, mention: bool = True) -> None:
+        """Register, analyse error and put it into queue to send to developers.
 
-        for chunk in code_chunks:
-            await self.bot.error_webhook.send(chunk)
+        This doesn't wait for the error to be sent, so error storms don't hold up the callers.
+        """
+        key = fingerprint(error)
+        if report := self.pending.get(key):
+            report.count += 1
+            report.last_seen = datetime.datetime.now(datetime.UTC)
+            log.debug("%s: `%s` (fingerprint %s, x%s).", error.__class__.__name__, embed.footer.text, key, report.count)
+            return
 
-        if mention:
-            await self.bot.error_webhook.send(embed=embed)
+        log.error("%s: `%s`.", error.__class__.__name__, embed.footer.text, exc_info=error)
+        self.pending[key] = ErrorReport(key, error, embed, mention=mention)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def deadline(self, report: ErrorReport) -> datetime.datetime:
+        """When the report should be sent unless the same error comes in again."""
+        return min(report.last_seen + self.window, report.first_seen + self.max_window)
+
+    async def _flush_later(self) -> None:
+        while self.pending:
+            now = datetime.datetime.now(datetime.UTC)
+            delay = (min(map(self.deadline, self.pending.values())) - now).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            due = [report for report in self.pending.values() if self.deadline(report) <= now]
+            for report in due:
+                del self.pending[report.fingerprint]
+            await self.send(due)
+
+    def should_ping(self, report: ErrorReport, now: datetime.datetime) -> bool:
+        """Whether to ping the developers about the report. Recurring errors only ping once per `ping_cooldown`."""
+        if not report.mention:
+            return False
+        last_pinged = self._last_pinged.get(report.fingerprint)
+        return last_pinged is None or now - last_pinged > self.ping_cooldown
+
+    async def flush(self) -> None:
+        """Send all pending reports now."""
+        reports, self.pending = list(self.pending.values()), {}
+        await self.send(reports)
+
+    async def send(self, reports: list[ErrorReport]) -> None:
+        if not reports:
+            return
+
+        now = datetime.datetime.now(datetime.UTC)
+        self._last_pinged = {key: dt for key, dt in self._last_pinged.items() if now - dt <= self.ping_cooldown}
+        ping = False
+        for report in reports:
+            if self.should_ping(report, now):
+                ping = True
+                self._last_pinged[report.fingerprint] = now
+
+        # discord allows 10 embeds and 6000 characters in embeds per message
+        batches: list[list[discord.Embed]] = [[]]
+        for report in reports:
+            embeds = report.embeds()
+            batch = batches[-1]
+            if batch and (len(batch) + len(embeds) > 10 or sum(map(len, batch + embeds)) > 6000):
+                batches.append(batch := [])
+            batch.extend(embeds)
+
+        try:
+            for index, batch in enumerate(batches):
+                content = self.bot.error_ping if ping and index == 0 else discord.utils.MISSING
+                await self.bot.error_webhook.send(content=content, embeds=batch)
+        except Exception:
+            # it's not the best idea to send errors about failing to send errors into the same webhook
+            log.warning("Failed to send %s error report(s) to the webhook.", len(reports), exc_info=True)
+
+    async def close(self) -> None:
+        """Send whatever is pending before the bot shuts down."""
+        if self._flush_task:
+            self._flush_task.cancel()
+        await self.flush()
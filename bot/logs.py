@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import datetime
+import json
 import logging
 import platform
+import queue
 from contextlib import contextmanager
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar, override
 
@@ -26,30 +29,54 @@ ASCII_STARTING_UP_ART = r"""
 
 
 @contextmanager
-def setup_logging() -> Generator[Any, Any, Any]:
-    """Setup logging."""
+def setup_logging(*, json_logs: bool = False) -> Generator[Any, Any, Any]:
+    """Setup logging.
+
+    The root logger only gets a `QueueHandler`, while the actual (blocking) handlers for console and files
+    are run by a `QueueListener` in its own thread, so disk I/O and file rotation never stall the event loop.
+
+    Parameters
+    ----------
+    json_logs
+        Whether to additionally write structured JSON lines into `.temp/irenesbot.jsonl`.
+    """
     log = logging.getLogger()
     log.setLevel(logging.INFO)
 
-    try:
-        # Stream Handler
-        handler = logging.StreamHandler()
-        handler.setFormatter(get_log_fmt(handler))
-        log.addHandler(handler)
-
-        # ensure logs folder
-        Path(".temp/").mkdir(parents=True, exist_ok=True)
-        # File Handler
-        file_handler = RotatingFileHandler(
-            filename=".temp/irenesbot.log",
+    # Stream Handler
+    handler = logging.StreamHandler()
+    handler.setFormatter(get_log_fmt(handler))
+
+    # ensure logs folder
+    Path(".temp/").mkdir(parents=True, exist_ok=True)
+    # File Handler
+    file_handler = RotatingFileHandler(
+        filename=".temp/irenesbot.log",
+        encoding="utf-8",
+        mode="w",
+        maxBytes=24 * 1024 * 1024,  # MiB
+        backupCount=2,  # Rotate through 2 files
+    )
+    file_handler.setFormatter(get_log_fmt(file_handler))
+    handlers: list[logging.Handler] = [handler, file_handler]
+
+    if json_logs:
+        json_handler = RotatingFileHandler(
+            filename=".temp/irenesbot.jsonl",
             encoding="utf-8",
             mode="w",
             maxBytes=24 * 1024 * 1024,  # MiB
-            backupCount=2,  # Rotate through 2 files
+            backupCount=2,
         )
-        file_handler.setFormatter(get_log_fmt(handler))
-        log.addHandler(file_handler)
+        json_handler.setFormatter(JSONLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    log.addHandler(LocalQueueHandler(log_queue))
+    listener.start()
 
+    try:
         if platform.system() == "Linux":
             # so start-ups in logs are way more noticeable
             log.info(ASCII_STARTING_UP_ART)
@@ -57,12 +84,49 @@ def setup_logging() -> Generator[Any, Any, Any]:
         yield
     finally:
         # __exit__
-        handlers = log.handlers[:]
-        for h in handlers:
+        # writes down whatever is left in the queue and joins the thread
+        listener.stop()
+        for h in [*log.handlers, *handlers]:
             h.close()
             log.removeHandler(h)
 
 
+class LocalQueueHandler(QueueHandler):
+    """`QueueHandler` for a queue within the same process.
+
+    Standard `prepare` formats the record and strips `exc_info`/`args` to make it picklable,
+    which we don't need - so handlers behind the listener still get the original record to format themselves
+    (i.e. colour tracebacks).
+    """
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # render the message now, while `args` are guaranteed not to be mutated by the logging code
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formatter that outputs one JSON object per record, so logs can be grepped/parsed by tools like `jq`."""
+
+    @override
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
 class MyColourFormatter(logging.Formatter):
     """My colour formatter.
 
@@ -0,0 +1,214 @@
+"""Metrics.
+
+Tiny in-process metrics registry: counters and latency histograms with percentiles.
+Listeners, commands, message matchers and `IrenesLoop` iterations are instrumented automatically,
+the numbers can be seen via `!stats` command or scraped from a local Prometheus-text endpoint.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import functools
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Generator
+
+    type Labels = tuple[tuple[str, str], ...]
+
+
+__all__ = (
+    "MetricsRegistry",
+    "MetricsServer",
+    "metrics",
+)
+
+log = logging.getLogger(__name__)
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    __slots__: tuple[str, ...] = ("value",)
+
+    def __init__(self) -> None:
+        self.value: int = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    """Observed values with cumulative count/sum and percentiles over the most recent `window` observations.
+
+    Percentiles are computed from a sliding window rather than from the whole lifetime of the bot,
+    so they reflect the current load and the memory footprint stays constant.
+    """
+
+    __slots__: tuple[str, ...] = ("count", "max", "recent", "sum")
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+        self.recent: collections.deque[float] = collections.deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def percentiles(self, *quantiles: float) -> list[float]:
+        """Get percentiles (nearest-rank) of the recent observations, i.e. `percentiles(0.5, 0.99)`."""
+        if not self.recent:
+            return [0.0 for _ in quantiles]
+        ordered = sorted(self.recent)
+        return [ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))] for q in quantiles]
+
+
+class MetricsRegistry:
+    """Registry of named metrics with labels.
+
+    Example
+    -------
+    ```py
+    metrics.counter("irenesbot_messages_total", channel="irene_adler__").inc()
+    with metrics.timer("listener", "event_stream_online"):
+        ...
+    ```
+    """
+
+    # name of the histogram/counter used by `timer`
+    DURATION: str = "irenesbot_handler_duration_seconds"
+    ERRORS: str = "irenesbot_handler_errors_total"
+
+    def __init__(self) -> None:
+        self.counters: dict[str, dict[Labels, Counter]] = collections.defaultdict(dict)
+        self.histograms: dict[str, dict[Labels, Histogram]] = collections.defaultdict(dict)
+
+    def counter(self, metric: str, /, **labels: str) -> Counter:
+        key = tuple(sorted(labels.items()))
+        family = self.counters[metric]
+        if (counter := family.get(key)) is None:
+            counter = family[key] = Counter()
+        return counter
+
+    def counter_value(self, metric: str, /, **labels: str) -> int:
+        """Read the counter's value without creating it (so no empty series end up in the export)."""
+        counter = self.counters.get(metric, {}).get(tuple(sorted(labels.items())))
+        return counter.value if counter else 0
+
+    def histogram(self, metric: str, /, **labels: str) -> Histogram:
+        key = tuple(sorted(labels.items()))
+        family = self.histograms[metric]
+        if (histogram := family.get(key)) is None:
+            histogram = family[key] = Histogram()
+        return histogram
+
+    @contextlib.contextmanager
+    def timer(self, kind: str, name: str) -> Generator[None, None, None]:
+        """Measure the duration of the block and count the errors raised from it."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.counter(self.ERRORS, kind=kind, name=name).inc()
+            raise
+        finally:
+            self.histogram(self.DURATION, kind=kind, name=name).observe(time.perf_counter() - start)
+
+    def instrument[**P, R](
+        self,
+        kind: str,
+        name: str,
+        func: Callable[P, Coroutine[Any, Any, R]],
+    ) -> Callable[P, Coroutine[Any, Any, R]]:
+        """Wrap a coroutine function so every call is timed with `timer`."""
+
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with self.timer(kind, name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    def handler_stats(self, query: str = "") -> list[tuple[str, str, Histogram]]:
+        """Get `(kind, name, histogram)` for handlers which names contain `query`, slowest p99 first."""
+        stats = [
+            (dict(labels)["kind"], dict(labels)["name"], histogram)
+            for labels, histogram in self.histograms[self.DURATION].items()
+            if query in dict(labels)["name"]
+        ]
+        stats.sort(key=lambda item: item[2].percentiles(0.99)[0], reverse=True)
+        return stats
+
+    @staticmethod
+    def _format_labels(labels: Labels, **extra: str) -> str:
+        pairs = [*labels, *extra.items()]
+        if not pairs:
+            return ""
+        escaped = (key + '="' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for key, value in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format.
+
+        Histograms are exposed as summaries (quantiles over the recent window + cumulative count/sum).
+        """
+        lines: list[str] = []
+        for name, family in sorted(self.counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{self._format_labels(labels)} {counter.value}" for labels, counter in family.items())
+
+        quantiles = (0.5, 0.9, 0.99)
+        for name, family in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {name} summary")
+            for labels, histogram in family.items():
+                for q, value in zip(quantiles, histogram.percentiles(*quantiles), strict=True):
+                    lines.append(f"{name}{self._format_labels(labels, quantile=str(q))} {value:.6f}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# one registry per process, so things like `IrenesLoop` can be instrumented without access to the bot
+metrics = MetricsRegistry()
+
+
+class MetricsServer:
+    """Local HTTP server exposing `/metrics` in Prometheus text format."""
+
+    def __init__(self, registry: MetricsRegistry, *, host: str = "127.0.0.1", port: int = 9184) -> None:
+        self.registry: MetricsRegistry = registry
+        self.host: str = host
+        self.port: int = port
+        self._runner: web.AppRunner | None = None
+
+    async def handle_metrics(self, _: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as exc:
+            # i.e. the port is taken by another instance of the bot - metrics are not worth crashing over
+            log.warning("Failed to start metrics server on %s:%s: %s", self.host, self.port, exc)
+            await runner.cleanup()
+            return
+        self._runner = runner
+        log.debug("Metrics server is running on http://%s:%s/metrics", self.host, self.port)
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
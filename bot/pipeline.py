@@ -0,0 +1,193 @@
+"""Chat Message Pipeline.
+
+Every chat message goes through here exactly once:
+it gets normalized into `ChatLine` (bot filter, prefix detection, tokens, lowered text)
+and then routed to the matchers that components registered with `@message_matcher`.
+
+This replaces the old approach of every component listening to `event_message` on its own
+and re-doing the same checks (bot names, prefixes, regexes) for every single message.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+from utils import const
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+    import twitchio
+    from twitchio.ext import commands
+
+    from .bot import IrenesBot
+
+    type MatcherCallback = Callable[[ChatLine], Coroutine[Any, Any, None]]
+
+
+__all__ = (
+    "ChatLine",
+    "MessagePipeline",
+    "message_matcher",
+)
+
+log = logging.getLogger(__name__)
+
+KNOWN_BOT_NAMES: frozenset[str] = frozenset(const.Bots)
+
+
+class ChatLine:
+    """Normalized chat message.
+
+    Cheap stuff is computed right away, a bit more expensive stuff like tokens is lazy
+    and computed at most once no matter how many matchers ask for it.
+    """
+
+    def __init__(self, message: twitchio.ChatMessage, prefixes: tuple[str, ...]) -> None:
+        self.message: twitchio.ChatMessage = message
+        self.text: str = message.text or ""
+        self.broadcaster_id: str = message.broadcaster.id
+        self.chatter_id: str = message.chatter.id
+        self.is_bot: bool = (message.chatter.name or "") in KNOWN_BOT_NAMES
+
+        self.prefix: str | None = next((p for p in prefixes if self.text.startswith(p)), None)
+        # text without !, ?, $
+        self.content: str = self.text[len(self.prefix) :] if self.prefix else self.text
+
+    @property
+    def is_prefixed(self) -> bool:
+        return self.prefix is not None
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self) -> list[str]:
+        return self.content.split()
+
+    @cached_property
+    def command(self) -> str | None:
+        """First word after the prefix, i.e. "hello" for "!hello world". `None` for non-prefixed messages."""
+        if self.prefix is None or not self.tokens:
+            return None
+        return self.tokens[0]
+
+
+@dataclass(slots=True)
+class MatcherSpec:
+    """Filters for `message_matcher`. They are checked by the pipeline before calling the matcher."""
+
+    bots: bool
+    prefixed: bool | None
+    channels: frozenset[str] | None
+
+    def check(self, line: ChatLine) -> bool:
+        if line.is_bot and not self.bots:
+            return False
+        if self.prefixed is not None and line.is_prefixed != self.prefixed:
+            return False
+        return not (self.channels is not None and line.broadcaster_id not in self.channels)
+
+
+@dataclass(slots=True)
+class Matcher:
+    callback: MatcherCallback
+    spec: MatcherSpec
+    owner: str
+
+
+def message_matcher(
+    *,
+    bots: bool = False,
+    prefixed: bool | None = None,
+    channels: tuple[str, ...] | None = None,
+) -> Callable[[MatcherCallback], MatcherCallback]:
+    """Register a component method in the `MessagePipeline`.
+
+    Parameters
+    ----------
+    bots
+        Whether messages from known bots (`const.Bots`) should be passed to the matcher.
+        Messages from Irene's Bot itself are never passed.
+    prefixed
+        `True` - only messages starting with a prefix, `False` - only messages without it, `None` - all messages.
+    channels
+        Broadcaster IDs to limit the matcher to. `None` means all channels.
+
+    Example
+    -------
+    ```py
+    @message_matcher(prefixed=True)
+    async def custom_commands(self, line: ChatLine) -> None: ...
+    ```
+    """
+
+    def decorator(func: MatcherCallback) -> MatcherCallback:
+        func.__message_matcher__ = MatcherSpec(  # type: ignore[attr-defined]
+            bots=bots,
+            prefixed=prefixed,
+            channels=frozenset(channels) if channels is not None else None,
+        )
+        return func
+
+    return decorator
+
+
+class MessagePipeline:
+    """Single-pass chat message dispatcher.
+
+    The bot feeds it every `twitchio.ChatMessage` once, the pipeline normalizes it into `ChatLine`
+    and calls all matchers that pass their (cheap) filters.
+    """
+
+    def __init__(self, bot: IrenesBot) -> None:
+        self.bot: IrenesBot = bot
+        self.matchers: list[Matcher] = []
+
+    def register_component(self, component: commands.Component) -> None:
+        """Register all `@message_matcher` methods of a component."""
+        owner = component.__class__.__qualname__
+        for name, func in inspect.getmembers(component.__class__, inspect.iscoroutinefunction):
+            spec: MatcherSpec | None = getattr(func, "__message_matcher__", None)
+            if spec is not None:
+                self.matchers.append(Matcher(getattr(component, name), spec, owner))
+                log.debug("Registered message matcher %s.%s", owner, name)
+
+    def unregister_component(self, component: commands.Component) -> None:
+        """Remove all matchers that belong to a component."""
+        owner = component.__class__.__qualname__
+        self.matchers = [matcher for matcher in self.matchers if matcher.owner != owner]
+
+    async def process(self, message: twitchio.ChatMessage) -> None:
+        """Normalize the message and route it to the matchers."""
+        if message.chatter.id == self.bot.bot_id:
+            # never react to our own messages
+            return
+
+        line = ChatLine(message, self.bot.prefixes)
+        matched = [matcher for matcher in self.matchers if matcher.spec.check(line)]
+        if len(matched) == 1:
+            await self.call_matcher(matched[0], line)
+        elif matched:
+            # some matchers sleep or talk to APIs, so they should not hold each other up
+            await asyncio.gather(*(self.call_matcher(matcher, line) for matcher in matched))
+
+    async def call_matcher(self, matcher: Matcher, line: ChatLine) -> None:
+        try:
+            with self.bot.metrics.timer("matcher", matcher.callback.__qualname__):
+                await matcher.callback(line)
+        except Exception as exc:
+            embed = (
+                discord.Embed(colour=0x5A3D8A, title=f"Error in message matcher `{matcher.owner}`")
+                .add_field(name="Message", value=f"```\n{line.text[:1000]}```", inline=False)
+                .set_footer(text=f"message_pipeline: {matcher.callback.__qualname__}")
+            )
+            await self.bot.exc_manager.register_error(exc, embed=embed)
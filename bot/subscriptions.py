@@ -0,0 +1,279 @@
+"""EventSub Subscriptions.
+
+Subscriptions are declared as data in `SUBSCRIPTIONS` table and registered concurrently by `SubscriptionManager`,
+so bot's cold start doesn't have to wait for a dozen of sequential HTTP round-trips.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+import twitchio
+from twitchio import eventsub
+
+from utils import const
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .bot import IrenesBot
+
+
+__all__ = (
+    "SUBSCRIPTIONS",
+    "SubscriptionManager",
+    "SubscriptionSpec",
+)
+
+log = logging.getLogger(__name__)
+
+
+class SubscriptionSpec(NamedTuple):
+    """Declaration of one EventSub subscription.
+
+    Attributes
+    ----------
+    name
+        Human readable name for logs/reports.
+    payload
+        Factory `(broadcaster_id, bot_id) -> payload`.
+    as_broadcaster
+        Whether the subscription requires the broadcaster's token instead of the bot's one.
+    """
+
+    name: str
+    payload: Callable[[str, str], eventsub.SubscriptionPayload]
+    as_broadcaster: bool = False
+
+
+# * TwitchDev Docs:
+#   Eventsub:   https://dev.twitch.tv/docs/eventsub/eventsub-subscription-types
+#   Scopes:     https://dev.twitch.tv/docs/authentication/scopes/
+# * TwitchIO  Docs:
+#   Events:     https://twitchio.dev/en/dev-3.0/references/events.html
+#   Models:     https://twitchio.dev/en/dev-3.0/references/eventsub_models.html
+
+# EventSub Subscriptions Table (order - function name sorted by alphabet).
+SUBSCRIPTIONS: tuple[SubscriptionSpec, ...] = (
+    # Subscription Name                         Permission
+    # ------------------------------------------------------
+    # ✅ Ad break begin                        channel:read:ads
+    SubscriptionSpec(
+        "Ad break begin",
+        lambda broadcaster, _: eventsub.AdBreakBeginSubscription(broadcaster_user_id=broadcaster),
+        as_broadcaster=True,
+    ),
+    # Bans                                  channel:moderate
+    SubscriptionSpec(
+        "Bans",
+        lambda broadcaster, _: eventsub.ChannelBanSubscription(broadcaster_user_id=broadcaster),
+        as_broadcaster=True,
+    ),
+    # ✅ Follows                               moderator:read:followers
+    SubscriptionSpec(
+        "Follows",
+        lambda broadcaster, bot: eventsub.ChannelFollowSubscription(
+            broadcaster_user_id=broadcaster, moderator_user_id=bot
+        ),
+    ),
+    # ✅ Channel Points Redeem                 channel:read:redemptions or channel:manage:redemptions
+    SubscriptionSpec(
+        "Channel Points Redeem",
+        lambda broadcaster, _: eventsub.ChannelPointsRedeemAddSubscription(broadcaster_user_id=broadcaster),
+        as_broadcaster=True,
+    ),
+    # ✅ Message                               user:read:chat from the chatting user, channel:bot from broadcaster
+    SubscriptionSpec(
+        "Message",
+        lambda broadcaster, bot: eventsub.ChatMessageSubscription(broadcaster_user_id=broadcaster, user_id=bot),
+    ),
+    # Raids to the channel                  No authorization required
+    SubscriptionSpec(
+        "Raids",
+        lambda broadcaster, _: eventsub.ChannelRaidSubscription(to_broadcaster_user_id=broadcaster),
+    ),
+    # ✅ Stream went offline                   No authorization required
+    SubscriptionSpec(
+        "Stream went offline",
+        lambda broadcaster, _: eventsub.StreamOfflineSubscription(broadcaster_user_id=broadcaster),
+    ),
+    # ✅ Stream went live                      No authorization required
+    SubscriptionSpec(
+        "Stream went live",
+        lambda broadcaster, _: eventsub.StreamOnlineSubscription(broadcaster_user_id=broadcaster),
+    ),
+    # ✅ Channel Update (title/game)           No authorization required
+    SubscriptionSpec(
+        "Channel Update",
+        lambda broadcaster, _: eventsub.ChannelUpdateSubscription(broadcaster_user_id=broadcaster),
+    ),
+)
+
+
+class SubscriptionResult:
+    """Outcome of the latest attempt to register a subscription for a channel."""
+
+    __slots__: tuple[str, ...] = ("attempts", "broadcaster_id", "elapsed", "error", "spec")
+
+    def __init__(self, spec: SubscriptionSpec, broadcaster_id: str) -> None:
+        self.spec: SubscriptionSpec = spec
+        self.broadcaster_id: str = broadcaster_id
+        self.attempts: int = 0
+        self.elapsed: float = 0.0
+        self.error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.attempts > 0 and self.error is None
+
+
+class SubscriptionManager:
+    """Registers `SUBSCRIPTIONS` for the bot's channels.
+
+    * subscriptions are sent concurrently, but at most `concurrency` requests are in flight at once;
+    * failed requests are retried with exponential backoff;
+    * every subscription's timing/attempts are kept in `results` for logs and `!subscriptions` report;
+    * `resubscribe` re-registers everything quickly i.e. after the websocket was closed for good.
+    """
+
+    def __init__(
+        self,
+        bot: IrenesBot,
+        *,
+        specs: Iterable[SubscriptionSpec] = SUBSCRIPTIONS,
+        concurrency: int = 5,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        self.bot: IrenesBot = bot
+        self.specs: tuple[SubscriptionSpec, ...] = tuple(specs)
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self.results: dict[tuple[str, str], SubscriptionResult] = {}  # (broadcaster_id, spec name) -> result
+        self._resubscribe_task: asyncio.Task[None] | None = None
+        self.closed: bool = False
+
+    def token_for(self, spec: SubscriptionSpec, broadcaster_id: str) -> str:
+        return broadcaster_id if spec.as_broadcaster else const.UserID.Bot
+
+    @staticmethod
+    def is_retryable(exc: Exception) -> bool:
+        """Whether the subscription request has a chance to succeed on the next attempt."""
+        if isinstance(exc, twitchio.HTTPException):
+            # bad request/missing scopes won't fix themselves, but rate limits and twitch's 5xx might
+            return exc.status == 429 or exc.status >= 500
+        return isinstance(exc, twitchio.WebsocketConnectionException | OSError | TimeoutError)
+
+    async def _subscribe(self, spec: SubscriptionSpec, broadcaster_id: str) -> SubscriptionResult:
+        result = self.results[broadcaster_id, spec.name] = SubscriptionResult(spec, broadcaster_id)
+        payload = spec.payload(broadcaster_id, const.UserID.Bot)
+        token_for = self.token_for(spec, broadcaster_id)
+
+        start = time.perf_counter()
+        for attempt in range(1, self.retries + 1):
+            result.attempts = attempt
+            try:
+                async with self._semaphore:
+                    # twitchio swallows 409 "already subscribed" itself, so re-subscribing is harmless
+                    await self.bot.subscribe_websocket(payload=payload, token_for=token_for, as_bot=False)
+            except Exception as exc:
+                result.error = exc
+                if not self.is_retryable(exc):
+                    break
+                if attempt < self.retries:
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    log.info(
+                        "Subscription %r for %s failed (%s), retrying in %.1fs", spec.name, broadcaster_id, exc, delay
+                    )
+                    await asyncio.sleep(delay)
+            else:
+                result.error = None
+                break
+        result.elapsed = time.perf_counter() - start
+
+        if result.error:
+            log.error(
+                "Failed to subscribe to %r for %s after %s attempt(s)",
+                spec.name,
+                broadcaster_id,
+                result.attempts,
+                exc_info=result.error,
+            )
+        else:
+            log.debug("Subscribed to %r for %s in %.3fs", spec.name, broadcaster_id, result.elapsed)
+        return result
+
+    async def _subscribe_group(self, pairs: list[tuple[SubscriptionSpec, str]]) -> list[SubscriptionResult]:
+        """Subscribe a group of subscriptions that share the same token.
+
+        The first one is awaited alone: twitchio creates the websocket for a token on its first subscription
+        and concurrent first subscriptions would race into creating several websockets.
+        """
+        first, *rest = pairs
+        results = [await self._subscribe(*first)]
+        results.extend(await asyncio.gather(*(self._subscribe(*pair) for pair in rest)))
+        return results
+
+    async def subscribe(self, broadcaster_ids: Iterable[str]) -> None:
+        """Register all subscriptions for the given channels concurrently."""
+        await self._subscribe_many([(spec, channel) for channel in broadcaster_ids for spec in self.specs])
+
+    async def _subscribe_many(self, pairs: Iterable[tuple[SubscriptionSpec, str]]) -> None:
+        groups: dict[str, list[tuple[SubscriptionSpec, str]]] = {}
+        for spec, broadcaster_id in pairs:
+            groups.setdefault(self.token_for(spec, broadcaster_id), []).append((spec, broadcaster_id))
+        if not groups:
+            return
+
+        start = time.perf_counter()
+        batches = await asyncio.gather(*(self._subscribe_group(group) for group in groups.values()))
+        results = [result for batch in batches for result in batch]
+        failed = sum(not result.ok for result in results)
+        log.info(
+            "Subscribed to %s/%s EventSub subscriptions in %.3fs",
+            len(results) - failed,
+            len(results),
+            time.perf_counter() - start,
+        )
+
+    async def resubscribe(self, *, failed_only: bool = False) -> None:
+        """Register the subscriptions again, either all of them or only those that failed last time."""
+        if failed_only:
+            await self._subscribe_many(
+                (result.spec, result.broadcaster_id) for result in self.results.values() if not result.ok
+            )
+        else:
+            await self.subscribe(self.bot.channels)
+
+    def schedule_resubscribe(self, delay: float = 5.0) -> None:
+        """Resubscribe to everything soon. Several calls in a quick succession result in one resubscribe."""
+        if self.closed or (self._resubscribe_task and not self._resubscribe_task.done()):
+            return
+
+        async def resubscribe_later() -> None:
+            # give twitchio a moment to finish its own reconnect logic
+            await asyncio.sleep(delay)
+            await self.resubscribe()
+
+        self._resubscribe_task = asyncio.create_task(resubscribe_later())
+
+    def report(self) -> str:
+        """Short summary of the subscriptions for chat or logs."""
+        results = list(self.results.values())
+        failed = [f"{result.spec.name} ({result.broadcaster_id})" for result in results if not result.ok]
+        slowest = max(results, key=lambda result: result.elapsed, default=None)
+        text = f"{len(results) - len(failed)}/{len(results)} subscriptions active"
+        if slowest:
+            text += f", slowest: {slowest.spec.name} {slowest.elapsed:.2f}s"
+        if failed:
+            text += f", failed: {', '.join(failed)}"
+        return text
+
+    def close(self) -> None:
+        self.closed = True
+        if self._resubscribe_task:
+            self._resubscribe_task.cancel()
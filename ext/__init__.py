@@ -3,7 +3,10 @@ from __future__ import annotations
 import platform
 from pkgutil import iter_modules
 
-__all__ = ("EXTENSIONS",)
+__all__ = (
+    "EXTENSIONS",
+    "extension_waves",
+)
 
 try:
     import _test
@@ -24,10 +27,15 @@ DISABLED_EXTENSIONS: tuple[str, ...] = (
 )
 
 CORE_EXTENSIONS: tuple[str, ...] = (
-    # extensions that should not loaded first
+    # extensions that should be loaded first (in this order), every other extension depends on them
     "ext.logs_via_webhook",
 )
 
+EXTENSION_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    # extension -> extensions that have to be loaded before it (besides `CORE_EXTENSIONS`)
+    # i.e. "ext.some_extension": ("ext.dota",),
+}
+
 
 def get_extensions() -> tuple[str, ...]:
     if platform.system() == "Windows" and not TEST_USE_ALL_EXTENSIONS:
@@ -46,3 +54,30 @@ def get_extensions() -> tuple[str, ...]:
 
 
 EXTENSIONS = get_extensions()
+
+
+def get_dependencies(extension: str) -> tuple[str, ...]:
+    if extension in CORE_EXTENSIONS:
+        return CORE_EXTENSIONS[: CORE_EXTENSIONS.index(extension)]
+    return CORE_EXTENSIONS + EXTENSION_DEPENDENCIES.get(extension, ())
+
+
+def extension_waves(extensions: tuple[str, ...]) -> list[tuple[str, ...]]:
+    """Split extensions into waves for loading.
+
+    Extensions of one wave don't depend on each other, so they can be loaded concurrently.
+    Dependencies that are not among `extensions` (i.e. disabled ones) are ignored.
+    """
+    remaining = {ext: {dep for dep in get_dependencies(ext) if dep in extensions} for ext in extensions}
+    waves: list[tuple[str, ...]] = []
+    while remaining:
+        wave = tuple(ext for ext, deps in remaining.items() if not deps)
+        if not wave:
+            msg = f"Circular dependency between extensions: {', '.join(remaining)}"
+            raise RuntimeError(msg)
+        waves.append(wave)
+        for ext in wave:
+            del remaining[ext]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+    return waves
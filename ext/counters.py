@@ -2,20 +2,28 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import logging
 import random
 import re
+from re import _constants as sre_constants, _parser as sre_parser
 from typing import TYPE_CHECKING, TypedDict, override
 
+import asyncpg
 from discord import Embed
 from twitchio.ext import commands
 
-from bot import IrenesComponent, irenes_loop
-from utils import const, formats
+from bot import IrenesComponent, irenes_loop, message_matcher
+from utils import const, errors, formats
+from utils.counters import CounterService
+from utils.matchers import MultiPatternMatcher
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+    from typing import Any
+
     import twitchio
 
-    from bot import IrenesBot
+    from bot import ChatLine, IrenesBot
 
     class FirstRedeemsRow(TypedDict):
         """`first_redeems` Table Columns."""
@@ -23,8 +31,93 @@ if TYPE_CHECKING:
         user_name: str
         first_times: int
 
+    class ChatCountersRow(TypedDict):
+        """`ttv_counters` Table Columns for chat counters."""
+
+        name: str
+        broadcaster_id: str
+        trigger: str
+        milestone_step: int
+
+
+log = logging.getLogger(__name__)
 
 FIRST_ID: str = "013b19fc-8024-4416-99a4-8cf130305b1f"
+# global inline flags, i.e. `(?i)`, are only allowed at the very start of the whole (combined) pattern
+GLOBAL_FLAGS_REGEX = re.compile(r"\(\?[aiLmsux]+\)")
+# triggers run against every chat message of the channel, so they have to stay small and cheap
+MAX_TRIGGER_LENGTH = 100
+# `re._parser` is private, but it's the only way to inspect the structure of a pattern
+REPEAT_OPCODES = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+
+def is_backtracking_prone(items: Sequence[tuple[Any, Any]], *, in_repeat: bool = False) -> bool:
+    """Whether the parsed regex has a repeated part that can be matched in many ways, i.e. `(a+)+` or `(a|ab)*`.
+
+    Such patterns backtrack catastrophically on some inputs and would stall the bot for every channel.
+    """
+    for opcode, value in items:
+        if opcode in REPEAT_OPCODES:
+            _, max_repeat, subpattern = value
+            looping = max_repeat > 1
+            if (in_repeat and looping) or is_backtracking_prone(subpattern, in_repeat=in_repeat or looping):
+                return True
+        elif opcode is sre_constants.BRANCH:
+            if in_repeat or any(is_backtracking_prone(branch, in_repeat=in_repeat) for branch in value[1]):
+                return True
+        elif opcode is sre_constants.SUBPATTERN:
+            if is_backtracking_prone(value[3], in_repeat=in_repeat):
+                return True
+        elif opcode in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if is_backtracking_prone(value[1], in_repeat=in_repeat):
+                return True
+        elif opcode is sre_constants.ATOMIC_GROUP and is_backtracking_prone(value, in_repeat=in_repeat):
+            return True
+    return False
+
+
+def check_trigger(trigger: str) -> None:
+    """Make sure the trigger regex can be a part of the combined pattern in `MultiPatternMatcher`.
+
+    Raises
+    ------
+    errors.BadArgumentError
+        The trigger is invalid or would break the combined pattern.
+    """
+    if len(trigger) > MAX_TRIGGER_LENGTH:
+        msg = f"Counter triggers can't be longer than {MAX_TRIGGER_LENGTH} characters."
+        raise errors.BadArgumentError(msg)
+    if GLOBAL_FLAGS_REGEX.search(trigger):
+        msg = "Inline flags like `(?i)` are not allowed in counter triggers, use a scoped group like `(?i:...)`."
+        raise errors.BadArgumentError(msg)
+    try:
+        compiled = re.compile(trigger)
+    except re.error as exc:
+        msg = f"Invalid trigger regex: {exc}"
+        raise errors.BadArgumentError(msg) from None
+    if compiled.groupindex or re.search(r"\\\d", trigger):
+        msg = "Named groups and backreferences are not allowed in counter triggers."
+        raise errors.BadArgumentError(msg)
+    if is_backtracking_prone(sre_parser.parse(trigger)):
+        msg = "Nested quantifiers and alternations under `*`/`+` are not allowed in counter triggers, i.e. `(a+)+`."
+        raise errors.BadArgumentError(msg)
+
+
+class ChatCounter:
+    """Definition of a counter that is incremented by chat messages matching its trigger regex."""
+
+    __slots__: tuple[str, ...] = ("broadcaster_id", "last_notification", "milestone_step", "name", "trigger")
+
+    def __init__(self, name: str, broadcaster_id: str, trigger: str, milestone_step: int) -> None:
+        self.name: str = name
+        self.broadcaster_id: str = broadcaster_id
+        self.trigger: str = trigger
+        self.milestone_step: int = milestone_step
+        self.last_notification: datetime.datetime = datetime.datetime.now(datetime.UTC)
+
+    @override
+    def __repr__(self) -> str:
+        return f"<ChatCounter name={self.name} broadcaster_id={self.broadcaster_id}>"
 
 
 class Counters(IrenesComponent):
@@ -32,61 +125,186 @@ class Counters(IrenesComponent):
 
     def __init__(self, bot: IrenesBot) -> None:
         super().__init__(bot)
-        self.last_erm_notification: datetime.datetime = datetime.datetime.now(datetime.UTC)
+        self.counters: CounterService = CounterService(bot)
+        self.chat_counters: dict[str, ChatCounter] = {}  # name -> counter
+        # broadcaster_id -> all triggers of the channel compiled into one pattern
+        self.matchers: dict[str, MultiPatternMatcher[ChatCounter]] = {}
 
     @override
     async def component_load(self) -> None:
+        await self.counters.load()
+        await self.load_chat_counters()
+        self.counters.start()
         self.check_first_reward.start()
 
     @override
     async def component_teardown(self) -> None:
         self.check_first_reward.cancel()
+        await self.counters.close()
 
-    # ERM COUNTERS
-
-    @commands.Component.listener(name="message")
-    async def erm_counter(self, message: twitchio.ChatMessage) -> None:
-        """Erm Counter."""
-        if message.chatter.name in const.Bots or not message.text or message.broadcaster.id != const.UserID.Irene:
-            # limit author/channel
-            return
-        if not re.search(r"\bErm\b", message.text):
-            return
+    # CHAT COUNTERS
 
+    async def load_chat_counters(self) -> None:
+        """Load counter definitions from the database and compile the matchers."""
         query = """--sql
-            UPDATE ttv_counters
-            SET value = value + 1
-            where name = $1
-            RETURNING value;
+            SELECT name, broadcaster_id, trigger, milestone_step
+            FROM ttv_counters
+            WHERE trigger IS NOT NULL AND broadcaster_id IS NOT NULL;
         """
-        value: int = await self.bot.pool.fetchval(query, "erm")
+        rows: list[ChatCountersRow] = await self.bot.pool.fetch(query)
+        self.chat_counters = {}
+        for row in rows:
+            counter = ChatCounter(row["name"], row["broadcaster_id"], row["trigger"], row["milestone_step"])
+            try:
+                check_trigger(counter.trigger)
+                self.build_matcher([counter])
+            except (errors.BadArgumentError, re.error) as exc:
+                # one bad row shouldn't take down every counter (and the component) with it
+                log.warning("Skipping chat counter %s with a broken trigger %r: %s", counter.name, counter.trigger, exc)
+                continue
+            self.chat_counters[counter.name] = counter
+
+        for broadcaster_id in {counter.broadcaster_id for counter in self.chat_counters.values()}:
+            self.rebuild_matcher(broadcaster_id)
+
+    def channel_counters(self, broadcaster_id: str) -> list[ChatCounter]:
+        return [counter for counter in self.chat_counters.values() if counter.broadcaster_id == broadcaster_id]
+
+    @staticmethod
+    def build_matcher(counters: Iterable[ChatCounter]) -> MultiPatternMatcher[ChatCounter]:
+        """Compile triggers of the counters into one matcher. Raises `re.error` if the combined pattern is invalid."""
+        matcher: MultiPatternMatcher[ChatCounter] = MultiPatternMatcher()
+        for counter in counters:
+            matcher.add_regex(counter, counter.trigger)
+        matcher.compile()
+        return matcher
+
+    def rebuild_matcher(self, broadcaster_id: str) -> None:
+        self.matchers[broadcaster_id] = self.build_matcher(self.channel_counters(broadcaster_id))
+
+    @message_matcher()
+    async def count_triggers(self, line: ChatLine) -> None:
+        """Increment all counters which triggers are present in the message."""
+        matcher = self.matchers.get(line.broadcaster_id)
+        if not matcher:
+            return
+
+        seen: set[ChatCounter] = set()
+        for counter, match in matcher.finditer(line.text):
+            if counter in seen:
+                # one message counts only once per counter
+                continue
+            seen.add(counter)
+            await self.increment_chat_counter(line, counter, match.group())
+
+    async def increment_chat_counter(self, line: ChatLine, counter: ChatCounter, word: str) -> None:
+        """Increment the counter and send milestone/reminder notifications if needed."""
+        # memory only, the database gets the value from `CounterService.flush_task`
+        before, after = self.counters.increment(counter.name)
 
         # milestone
-        if value % 1000 == 0:
-            await message.broadcaster.send_message(
+        if milestone := self.counters.crossed_milestone(before, after, counter.milestone_step):
+            await line.message.broadcaster.send_message(
                 sender=self.bot.bot_id,
-                message=f"{const.STV.wow} we reached a milestone of {value} {const.STV.Erm} in chat",
+                message=f"{const.STV.wow} we reached a milestone of {milestone} {word} in chat",
             )
             return
 
         # random notification/reminder
         now = datetime.datetime.now(datetime.UTC)
-        if random.randint(0, 150) < 2 and (now - self.last_erm_notification).seconds > 180:
+        if random.randint(0, 150) < 2 and (now - counter.last_notification).seconds > 180:
+            counter.last_notification = now
             await asyncio.sleep(3)
-            query = "SELECT value FROM ttv_counters WHERE name = $1"
-            value: int = await self.bot.pool.fetchval(query, "erm")
-            await message.broadcaster.send_message(
+            await line.message.broadcaster.send_message(
                 sender=self.bot.bot_id,
-                message=f"{value} {const.STV.Erm} in chat.",
+                message=f"{self.counters.get(counter.name)} {word} in chat.",
             )
-            return
 
     @commands.command(aliases=["erm"])
     async def erms(self, ctx: commands.Context) -> None:
         """Get an erm_counter value."""
-        query = "SELECT value FROM ttv_counters WHERE name = $1"
-        value: int = await self.bot.pool.fetchval(query, "erm")
-        await ctx.send(f"{value} {const.STV.Erm} in chat.")
+        await ctx.send(f"{self.counters.get('erm')} {const.STV.Erm} in chat.")
+
+    @commands.group(name="counter", invoke_fallback=True)
+    async def counter_group(self, ctx: commands.Context, name: str = "") -> None:
+        """Show the value of a counter, i.e. `!counter erm`.
+
+        Use subcommands "counter add/del/list" to manage chat counters.
+        """
+        if not name:
+            await ctx.send('You need to provide a counter name or use subcommands, i.e. "counter add/del/list"')
+            return
+        if name not in self.counters.values:
+            msg = f"There is no counter named {name}."
+            raise errors.BadArgumentError(msg)
+        await ctx.send(f"{name} counter: {self.counters.get(name)}")
+
+    @commands.is_moderator()
+    @counter_group.command(name="add")
+    async def counter_add(self, ctx: commands.Context, name: str, milestone_step: int, *, trigger: str) -> None:
+        """Add a chat counter, i.e. `!counter add pog 500 \\bPog(U|Champ)?\\b`.
+
+        Parameters
+        ----------
+        name
+            Name of the counter, it's unique across all channels.
+        milestone_step
+            The bot announces every time the counter reaches a multiple of this number. 0 disables announcements.
+        trigger
+            Regex that messages should match to increment the counter.
+        """
+        check_trigger(trigger)
+        counter = ChatCounter(name, ctx.broadcaster.id, trigger, milestone_step)
+        # compile the exact pattern the channel is going to use before anything is saved
+        try:
+            matcher = self.build_matcher([*self.channel_counters(ctx.broadcaster.id), counter])
+        except re.error as exc:
+            msg = f"Invalid trigger regex: {exc}"
+            raise errors.BadArgumentError(msg) from None
+
+        query = """--sql
+            INSERT INTO ttv_counters (name, value, broadcaster_id, trigger, milestone_step)
+            VALUES ($1, 0, $2, $3, $4);
+        """
+        async with self.counters.flushing():
+            try:
+                await self.bot.pool.execute(query, name, ctx.broadcaster.id, trigger, milestone_step)
+            except asyncpg.UniqueViolationError:
+                msg = "There already exists a counter with such name."
+                raise errors.BadArgumentError(msg)
+            self.counters.register(name)
+
+        self.chat_counters[name] = counter
+        self.matchers[ctx.broadcaster.id] = matcher
+        await ctx.send(f"Added the counter {name}.")
+
+    @commands.is_moderator()
+    @counter_group.command(name="del")
+    async def counter_delete(self, ctx: commands.Context, name: str) -> None:
+        """Delete a chat counter of this channel by name."""
+        counter = self.chat_counters.get(name)
+        if counter is None or counter.broadcaster_id != ctx.broadcaster.id:
+            msg = "There is no chat counter with such name in this channel."
+            raise errors.BadArgumentError(msg)
+
+        async with self.counters.flushing():
+            # under the flush lock so a flush in progress doesn't bring the row back
+            await self.bot.pool.execute("DELETE FROM ttv_counters WHERE name = $1", name)
+            self.counters.discard(name)
+
+        del self.chat_counters[name]
+        self.rebuild_matcher(ctx.broadcaster.id)
+        await ctx.send(f"Deleted the counter {name}.")
+
+    @counter_group.command(name="list")
+    async def counter_list(self, ctx: commands.Context) -> None:
+        """List chat counters of this channel."""
+        names = [
+            f"{counter.name}: {self.counters.get(counter.name)}"
+            for counter in self.chat_counters.values()
+            if counter.broadcaster_id == ctx.broadcaster.id
+        ]
+        await ctx.send(", ".join(names) if names else "No chat counters in this channel.")
 
     # FIRST COUNTER
 
@@ -3,14 +3,16 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, TypedDict, override
 
 import asyncpg
-import twitchio  # noqa: TCH002
 from twitchio.ext import commands
 
-from bot import IrenesComponent, irenes_loop
+from bot import IrenesComponent, irenes_loop, message_matcher
 from utils import const, errors
+from utils.matchers import PrefixTrie
 
 if TYPE_CHECKING:
-    from bot import IrenesBot
+    from collections.abc import Iterator
+
+    from bot import ChatLine, IrenesBot
 
     class TwitchCommands(TypedDict):
         """`chat_commands` Table Structure."""
@@ -20,6 +22,46 @@ if TYPE_CHECKING:
         content: str
 
 
+class ChannelCommands:
+    """Custom commands of one channel, indexed for lookups from chat.
+
+    * exact hash lookup by the first token, i.e. "!hello" -> "hello";
+    * (optional) prefix trie fallback for the longest command name that the token starts with,
+        i.e. "!hellochat" -> "hello". This is how the commands used to work before the index.
+
+    Either way, exactly one command is resolved per message.
+    """
+
+    __slots__: tuple[str, ...] = ("commands", "prefix_matching", "trie")
+
+    def __init__(self, *, prefix_matching: bool = True) -> None:
+        self.commands: dict[str, str] = {}
+        self.trie: PrefixTrie[str] = PrefixTrie()
+        self.prefix_matching: bool = prefix_matching
+
+    def __bool__(self) -> bool:
+        return bool(self.commands)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.commands)
+
+    def set(self, command_name: str, content: str) -> None:
+        self.commands[command_name] = content
+        self.trie[command_name] = content
+
+    def remove(self, command_name: str) -> None:
+        del self.commands[command_name]
+        del self.trie[command_name]
+
+    def resolve(self, token: str) -> str | None:
+        """Get the response for the command invoked with `token` (the first word after the prefix)."""
+        if (content := self.commands.get(token)) is not None:
+            return content
+        if self.prefix_matching and (found := self.trie.longest_prefix(token)):
+            return found[1]
+        return None
+
+
 class CustomCommands(IrenesComponent):
     """Custom commands.
 
@@ -29,7 +71,7 @@ class CustomCommands(IrenesComponent):
 
     def __init__(self, bot: IrenesBot) -> None:
         super().__init__(bot)
-        self.command_cache: dict[str, dict[str, str]] = {}
+        self.command_cache: dict[str, ChannelCommands] = {}
 
     @override
     async def component_load(self) -> None:
@@ -48,31 +90,25 @@ class CustomCommands(IrenesComponent):
         """
         rows: list[TwitchCommands] = await self.bot.pool.fetch(query)
         for row in rows:
-            self.command_cache.setdefault(row["streamer_id"], {})[row["command_name"]] = row["content"]
+            self.command_cache.setdefault(row["streamer_id"], ChannelCommands()).set(row["command_name"], row["content"])
 
-    @commands.Component.listener(name="message")
-    async def event_message(self, message: twitchio.ChatMessage) -> None:
+    @message_matcher(bots=True, prefixed=True)
+    async def event_message(self, line: ChatLine) -> None:
         """Listen to prefix custom commands.
 
         This is a bit different from twitchio commands. This one is just for this cog.
         """
-        if not message.text.startswith(self.bot.prefixes) or message.chatter.id == const.UserID.Bot:
-            return
-
-        channel_commands = self.command_cache.get(message.broadcaster.id, {})
-        if not channel_commands:
+        channel_commands = self.command_cache.get(line.broadcaster_id)
+        if not channel_commands or line.command is None:
             # no commands registered for this channel
             return
 
-        # text without !, ?, $
-        no_prefix_text = message.text[1:]
-
-        for command_name, command_response in channel_commands.items():
-            if no_prefix_text.startswith(command_name):
-                await message.broadcaster.send_message(
-                    sender=const.UserID.Bot,
-                    message=command_response,
-                )
+        command_response = channel_commands.resolve(line.command)
+        if command_response is not None:
+            await line.message.broadcaster.send_message(
+                sender=const.UserID.Bot,
+                message=command_response,
+            )
 
     @commands.is_moderator()
     @commands.group(invoke_fallback=True)
@@ -95,7 +131,7 @@ class CustomCommands(IrenesComponent):
             msg = "There already exists a command with such name."
             raise errors.BadArgumentError(msg)
 
-        self.command_cache.setdefault(ctx.broadcaster.id, {})[cmd_name] = text
+        self.command_cache.setdefault(ctx.broadcaster.id, ChannelCommands()).set(cmd_name, text)
         await ctx.send(f"Added the command {cmd_name}.")
 
     @commands.is_moderator()
@@ -112,7 +148,7 @@ class CustomCommands(IrenesComponent):
             msg = "There is no command with such name."
             raise errors.BadArgumentError(msg)
 
-        self.command_cache[ctx.broadcaster.id].pop(command_name)
+        self.command_cache[ctx.broadcaster.id].remove(command_name)
         await ctx.send(f"Deleted the command {command_name}")
 
     @commands.is_moderator()
@@ -130,7 +166,7 @@ class CustomCommands(IrenesComponent):
             msg = "There is no command with such name."
             raise errors.BadArgumentError(msg)
 
-        self.command_cache[ctx.broadcaster.id][command_name] = text
+        self.command_cache[ctx.broadcaster.id].set(command_name, text)
         await ctx.send(f"Edited the command {command_name}.")
 
     # TODO: THIS IS KINDA BAD, we need more centralized help, maybe git page
@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING, Annotated
 
 from twitchio.ext import commands
 
-from bot import IrenesComponent
+from bot import IrenesComponent, task_registry
 from utils import const, guards
 
 if TYPE_CHECKING:
@@ -89,16 +89,75 @@ class Development(IrenesComponent):
         * If somehow eventsub missed stream_online notification - this can "manually"
             fix the problem of soft-locking the commands.
         """
-        self.bot.irene_online = True
+        self.bot.online_channels.add(ctx.broadcaster.id)
         await ctx.send(f"I'll treat {ctx.broadcaster.display_name} as online now {const.STV.dankHey}")
 
     @commands.is_owner()
     @commands.command()
     async def offline(self, ctx: commands.Context) -> None:
         """Make the bot treat streamer as offline."""
-        self.bot.irene_online = False
+        self.bot.online_channels.discard(ctx.broadcaster.id)
         await ctx.send(f"I'll treat {ctx.broadcaster.display_name} as offline now {const.STV.donkSad}")
 
+    @commands.is_owner()
+    @commands.command()
+    async def stats(self, ctx: commands.Context, *, query: str = "") -> None:
+        """Show latency of the slowest handlers (listeners, commands, matchers, loops).
+
+        Format is `name p50/p99 ms (calls, errors)`. `query` filters handlers by name, i.e. `!stats update`.
+        """
+        stats = self.bot.metrics.handler_stats(query)
+        if not stats:
+            await ctx.send(f"No stats for that yet {const.STV.donkSad}")
+            return
+
+        parts: list[str] = []
+        for kind, name, histogram in stats[:5]:
+            p50, p99 = histogram.percentiles(0.5, 0.99)
+            errors = self.bot.metrics.counter_value(self.bot.metrics.ERRORS, kind=kind, name=name)
+            parts.append(f"{kind} {name} {p50 * 1000:.1f}/{p99 * 1000:.1f}ms ({histogram.count}, {errors})")
+        await ctx.send(" | ".join(parts)[:500])
+
+    @commands.is_owner()
+    @commands.command()
+    async def tasks(self, ctx: commands.Context, *, query: str = "") -> None:
+        """Show running `irenes_loop` tasks grouped by category.
+
+        Format is `category xN (iterations, max duration, overruns)`. `query` filters categories by name.
+        """
+        categories = {
+            category: loops for category, loops in task_registry.by_category().items() if query in category
+        }
+        if not categories:
+            await ctx.send(f"No running tasks {const.STV.donkSad}")
+            return
+
+        parts: list[str] = []
+        for category, loops in sorted(categories.items(), key=lambda item: len(item[1]), reverse=True):
+            iterations = sum(loop.stats.iterations for loop in loops)
+            max_duration = max(loop.stats.max_duration for loop in loops)
+            overruns = sum(loop.stats.overruns for loop in loops)
+            limit = task_registry.limits.get(category)
+            count = f"x{len(loops)}" + (f"/{limit}" if limit else "")
+            parts.append(f"{category} {count} ({iterations}, {max_duration * 1000:.0f}ms, {overruns})")
+        await ctx.send(" | ".join(parts)[:500])
+
+    @commands.is_owner()
+    @commands.command()
+    async def subscriptions(self, ctx: commands.Context) -> None:
+        """Show EventSub subscriptions status."""
+        await ctx.send(self.bot.subscriptions.report())
+
+    @commands.is_owner()
+    @commands.command()
+    async def resubscribe(self, ctx: commands.Context, mode: str = "failed") -> None:
+        """Register EventSub subscriptions again.
+
+        `!resubscribe` retries only failed subscriptions, `!resubscribe all` re-registers everything.
+        """
+        await self.bot.subscriptions.resubscribe(failed_only=mode != "all")
+        await ctx.send(f"{const.STV.DankApprove} {self.bot.subscriptions.report()}")
+
 
 async def setup(bot: IrenesBot) -> None:
     """Load IrenesBot extension. Framework of twitchio."""
@@ -11,9 +11,11 @@ import config
 from bot import IrenesComponent, irenes_loop
 from utils import const, errors, helpers
 
-from .models import Streamer
+from .models import Streamer, StreamerRegistry
 
 if TYPE_CHECKING:
+    from steam import User
+
     from bot import IrenesBot
 
     from .enums import RPStatus
@@ -36,18 +38,23 @@ class DotaCommands(IrenesComponent):
 
     def __init__(self, bot: IrenesBot) -> None:
         super().__init__(bot)
-        self.streamer: Streamer = Streamer(self.bot, config.IRENE_STEAM_ID64)
-        self.debug_mode: bool = True
+        self.streamers: StreamerRegistry = StreamerRegistry(self.bot)
+        # Irene is always tracked, even if she's somehow missing from the database
+        self.streamers.add(Streamer(self.bot, config.IRENE_STEAM_ID64, debug=True))
 
-    async def debug_send(self, message: str) -> None:
-        if self.debug_mode:
-            await self.deliver(f"[debug] {message}")
+    async def debug_send(self, streamer: Streamer, message: str) -> None:
+        """Send a debug message into the streamer's channel if the channel opted in for them."""
+        if streamer.debug:
+            await self.deliver(f"[debug] {message}", broadcaster_id=streamer.twitch_id)
 
     @override
     async def component_load(self) -> None:
         """Cog load."""
         await self.bot.instantiate_steam_web_api()
         await self.bot.instantiate_cache_dota()
+        self.bot.instantiate_profile_cards()
+        self.bot.instantiate_live_matches()
+        await self.streamers.load()
 
         self.clean_up_the_database.start()
         self.check_streamers_rich_presence.start()
@@ -60,7 +67,7 @@ class DotaCommands(IrenesComponent):
 
     @irenes_loop(hours=48)
     async def clean_up_the_database(self) -> None:
-        log.debug("Task: cleaning database from too old matches.")
+        log.debug("Task: cleaning database from too old matches and gaming sessions.")
         query = """
             DELETE FROM ttv_dota_matches
             WHERE match_id IN (
@@ -75,35 +82,54 @@ class DotaCommands(IrenesComponent):
         cutoff_dt = now - datetime.timedelta(hours=48)
         await self.bot.pool.execute(query, cutoff_dt)
 
+        # the latest session of every account is kept (`!wl` might still need it), older ones go with the matches
+        query = """
+            DELETE FROM ttv_dota_sessions s
+            WHERE session_start < $1 AND session_start < (
+                SELECT MAX(latest.session_start) FROM ttv_dota_sessions latest WHERE latest.account_id = s.account_id
+            )
+        """
+        await self.bot.pool.execute(query, cutoff_dt)
+
         if self.clean_up_the_database.current_loop == 0:
-            await self.streamer.fix_match_history()
+            for streamer in self.streamers:
+                await streamer.fix_match_history()
+
+    @commands.Component.listener("event_steam_rich_presence_update")
+    async def steam_rich_presence_update(self, user: User) -> None:
+        if streamer := self.streamers.get_by_steam_id(user.id64):
+            await streamer.update()
 
-    @irenes_loop(seconds=10)
+    @irenes_loop(minutes=1)
     async def check_streamers_rich_presence(self) -> None:
-        await self.streamer.update()
+        """Watchdog for `steam_rich_presence_update` events in case steam misses some of them.
+
+        i.e. right after the bot's start or Steam reconnects.
+        """
+        await self.streamers.update_all()
 
     @commands.Component.listener("event_rich_presence_changed")
-    async def rich_presence_changed(self, status: RPStatus) -> None:
+    async def rich_presence_changed(self, streamer: Streamer, status: RPStatus) -> None:
         if status.name == f"{status.__class__.__name__}UnknownValue":
             if "Crownfall" in status.value:
                 # skip crownfall mini-games for now
                 # TODO: remove when Crownfall is over, or maybe implement a series of block-words so like Deadlock statues don't show up as well;
                 return
-            await self.debug_send(f'RP Change: Unknown "{status.value}"')
+            await self.debug_send(streamer, f'RP Change: Unknown "{status.value}"')
         else:
-            await self.debug_send(f"RP Change: {status}")
+            await self.debug_send(streamer, f"RP Change: {status}")
 
     @commands.Component.listener("event_reset_streamer")
-    async def reset_streamer(self, event_msg: str) -> None:
-        await self.debug_send(f"Reset: {event_msg}")
+    async def reset_streamer(self, streamer: Streamer, event_msg: str) -> None:
+        await self.debug_send(streamer, f"Reset: {event_msg}")
 
     @commands.Component.listener("event_match_data_ready")
-    async def announce_data_ready(self) -> None:
-        await self.debug_send(f"Players+Match Data Ready! (1/2) {const.STV.wickedchad}")
+    async def announce_data_ready(self, streamer: Streamer) -> None:
+        await self.debug_send(streamer, f"Players+Match Data Ready! (1/2) {const.STV.wickedchad}")
 
     @commands.Component.listener("event_match_hero_ready")
-    async def announce_hero_ready(self) -> None:
-        await self.debug_send(f"Hero Info Ready! (2/2) {const.STV.wickedchad}")
+    async def announce_hero_ready(self, streamer: Streamer) -> None:
+        await self.debug_send(streamer, f"Hero Info Ready! (2/2) {const.STV.wickedchad}")
 
     # @commands.Component.listener("event_check_last_games")
     # async def start_checking_match_outcome(self, match_id: int, hero: Hero) -> None:
@@ -123,32 +149,32 @@ class DotaCommands(IrenesComponent):
 
     # ACTIVE MATCH COMMANDS
 
-    async def get_active_match(self, *, is_hero: bool) -> ActiveMatch:
+    async def get_active_match(self, ctx: commands.Context, *, is_hero: bool) -> ActiveMatch:
         start = perf_counter()
 
-        match = self.streamer.active_match
+        streamer = self.streamers.for_channel(ctx.broadcaster.id)
+        match = streamer.active_match
         if match is None:
-            await self.streamer.update()
+            await streamer.update()
         else:
-            if not match.is_data_ready:
-                await match.update_data()
-            if is_hero and not match.is_hero_ready:
-                await match.update_heroes()
+            if not match.is_data_ready or (is_hero and not match.is_hero_ready):
+                await match.refresh()
 
         if match:
             return match
         else:
-            if self.streamer.unsupported_error:
-                msg = self.streamer.unsupported_error
+            if streamer.unsupported_error:
+                msg = streamer.unsupported_error
             else:
-                msg = f"No Game Found. Irene's Status: {self.streamer.rp_status.display_name}"
+                msg = f"No Game Found. {streamer.twitch_name}'s Status: {streamer.rp_status.display_name}"
 
             perf_time = perf_counter() - start
             msg = f"[{perf_time:.3f}s] {msg}"
             raise errors.GameNotFoundError(msg)
 
-    def fmt_response(self, response: str, is_watch: bool, perf: helpers.measure_time) -> str:
-        debug_prefix = f"[{perf.end:.3f}s] " if self.debug_mode else ""
+    def fmt_response(self, ctx: commands.Context, response: str, is_watch: bool, perf: helpers.measure_time) -> str:
+        streamer = self.streamers.by_twitch_id.get(ctx.broadcaster.id)
+        debug_prefix = f"[{perf.end:.3f}s] " if streamer and streamer.debug else ""
         tag = "[Watching] " if is_watch else ""
         return debug_prefix + tag + response
 
@@ -156,31 +182,31 @@ class DotaCommands(IrenesComponent):
     async def game_medals(self, ctx: commands.Context) -> None:
         """Fetch each player rank medals in the current game."""
         async with helpers.measure_time() as perf:
-            active_match = await self.get_active_match(is_hero=False)
+            active_match = await self.get_active_match(ctx, is_hero=False)
             response = active_match.game_medals()
-        await ctx.send(self.fmt_response(response, active_match.is_watch, perf))
+        await ctx.send(self.fmt_response(ctx, response, active_match.is_watch, perf))
 
     @commands.command()
     async def ranked(self, ctx: commands.Context) -> None:
         """Fetch each player rank medals in the current game."""
         async with helpers.measure_time() as perf:
-            active_match = await self.get_active_match(is_hero=False)
+            active_match = await self.get_active_match(ctx, is_hero=False)
             response = active_match.ranked()
-        await ctx.send(self.fmt_response(response, active_match.is_watch, perf))
+        await ctx.send(self.fmt_response(ctx, response, active_match.is_watch, perf))
 
     @commands.command()
     async def smurfs(self, ctx: commands.Context) -> None:
         async with helpers.measure_time() as perf:
-            active_match = await self.get_active_match(is_hero=False)
+            active_match = await self.get_active_match(ctx, is_hero=False)
             response = active_match.smurfs()
-        await ctx.send(self.fmt_response(response, active_match.is_watch, perf))
+        await ctx.send(self.fmt_response(ctx, response, active_match.is_watch, perf))
 
     @commands.command(aliases=["items", "item", "player"])
     async def profile(self, ctx: commands.Context, *, argument: str) -> None:
         async with helpers.measure_time() as perf:
-            active_match = await self.get_active_match(is_hero=False)
+            active_match = await self.get_active_match(ctx, is_hero=False)
             response = await active_match.profile(argument)
-        await ctx.send(self.fmt_response(response, active_match.is_watch, perf))
+        await ctx.send(self.fmt_response(ctx, response, active_match.is_watch, perf))
 
     @profile.error
     async def profile_error(self, payload: commands.CommandErrorPayload) -> None:
@@ -194,18 +220,18 @@ class DotaCommands(IrenesComponent):
     @commands.command(aliases=["matchid"])
     async def match_id(self, ctx: commands.Context) -> None:
         async with helpers.measure_time() as perf:
-            active_match = await self.get_active_match(is_hero=False)
+            active_match = await self.get_active_match(ctx, is_hero=False)
             response = f"{active_match.match_id}"
-        await ctx.send(self.fmt_response(response, active_match.is_watch, perf))
+        await ctx.send(self.fmt_response(ctx, response, active_match.is_watch, perf))
 
     # LAST GAME
 
     @commands.command(aliases=["lg", "lm"])
     async def last_game(self, ctx: commands.Context) -> None:
         async with helpers.measure_time() as perf:
-            last_game = self.streamer.last_game
+            last_game = self.streamers.for_channel(ctx.broadcaster.id).last_game
             response = last_game.last_game_command_response if last_game else "No Data Yet."
-        await ctx.send(self.fmt_response(response, False, perf))
+        await ctx.send(self.fmt_response(ctx, response, False, perf))
 
     # STREAMER INFO COMMANDS
 
@@ -218,23 +244,23 @@ class DotaCommands(IrenesComponent):
         """
         # await self.prepare()  # do we need it here ?
         async with helpers.measure_time() as perf:
-            response = await self.streamer.wl_command_response()
-        await ctx.send(self.fmt_response(response, False, perf))
+            response = await self.streamers.for_channel(ctx.broadcaster.id).wl_command_response()
+        await ctx.send(self.fmt_response(ctx, response, False, perf))
 
     @commands.command()
     async def mmr(self, ctx: commands.Context) -> None:
         async with helpers.measure_time() as perf:
-            response = await self.streamer.mmr_command_response()
-        await ctx.send(self.fmt_response(response, False, perf))
+            response = await self.streamers.for_channel(ctx.broadcaster.id).mmr_command_response()
+        await ctx.send(self.fmt_response(ctx, response, False, perf))
 
     @commands.is_moderator()
     @commands.command(name="setmmr")
     async def set_mmr(self, ctx: commands.Context, mmr: int) -> None:
         async with helpers.measure_time() as perf:
             query = "UPDATE ttv_dota_streamers SET mmr = $1 WHERE account_id = $2"
-            await self.bot.pool.execute(query, mmr, self.streamer.account_id)
+            await self.bot.pool.execute(query, mmr, self.streamers.for_channel(ctx.broadcaster.id).account_id)
             response = f"Set mmr to {mmr}"
-        await ctx.send(self.fmt_response(response, False, perf))
+        await ctx.send(self.fmt_response(ctx, response, False, perf))
 
     @irenes_loop(time=datetime.time(hour=6, minute=34, second=10))
     async def check_twitch_accounts_renames(self) -> None:
@@ -261,7 +287,11 @@ class DotaCommands(IrenesComponent):
     # NOT ACTIVE
     @irenes_loop(hours=3)
     async def double_check_task(self) -> None:
-        account_id = self.streamer.account_id
+        for streamer in self.streamers:
+            await self.double_check_streamer_matches(streamer)
+
+    async def double_check_streamer_matches(self, streamer: Streamer) -> None:
+        account_id = streamer.account_id
 
         partial_user = self.bot.dota.instantiate_partial_user(account_id)
         match_history = await partial_user.match_history()
@@ -283,7 +313,8 @@ class DotaCommands(IrenesComponent):
 
         for match_id in to_add_match_ids:
             history_match = history_match_ids[match_id]
-            await self.streamer.add_completed_match_to_database(history_match)
+            await streamer.add_completed_match(history_match)
+        await streamer.matches.flush()
 
     @double_check_task.before_loop
     @clean_up_the_database.before_loop
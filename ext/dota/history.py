@@ -0,0 +1,173 @@
+"""Match History Sync.
+
+Streamer's completed matches are synced from Game Coordinator's match history into `ttv_dota_matches` incrementally:
+the id of the newest synced match is persisted in `ttv_dota_history_cursors`, so every sync only pages through
+the matches played after it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+from .enums import PlayerMatchOutcome
+from .repository import MatchRow
+
+if TYPE_CHECKING:
+    from steam.ext.dota2 import MatchHistoryMatch, MatchMinimal, PartialUser
+
+    from bot import IrenesBot
+
+    from .repository import MatchRepository
+
+
+__all__ = ("MatchHistorySync",)
+
+log = logging.getLogger(__name__)
+
+
+class SyncedMatch(NamedTuple):
+    history_match: MatchHistoryMatch
+    minimal_match: MatchMinimal
+    outcome: PlayerMatchOutcome
+
+
+class MatchHistorySync:
+    """Incremental match history sync for one account.
+
+    * `fetch_new_matches` pages through the match history until it reaches the persisted cursor (or `cutoff`);
+    * `minimal()` data for the new matches is fetched concurrently, at most `concurrency` requests at once;
+    * all new rows (via `MatchRepository`) and the moved cursor are written in one transaction.
+
+    If some matches failed to fetch, the cursor only moves up to the oldest failed match,
+    so the next sync picks them up again (inserts are idempotent).
+    """
+
+    def __init__(
+        self,
+        bot: IrenesBot,
+        account_id: int,
+        repository: MatchRepository,
+        *,
+        concurrency: int = 5,
+        cutoff: datetime.timedelta = datetime.timedelta(hours=48),
+        max_pages: int = 10,
+    ) -> None:
+        self.bot: IrenesBot = bot
+        self.account_id: int = account_id
+        self.repository: MatchRepository = repository
+        self.cutoff: datetime.timedelta = cutoff
+        self.max_pages: int = max_pages
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        # the newest match in the match history as of the last sync (even if it was synced before)
+        self.latest_match: MatchHistoryMatch | None = None
+
+    async def get_cursor(self) -> int | None:
+        """Get id of the newest synced match."""
+        query = "SELECT last_match_id FROM ttv_dota_history_cursors WHERE account_id = $1"
+        cursor: int | None = await self.bot.pool.fetchval(query, self.account_id)
+        if cursor is None:
+            # the first sync for the account - continue from what is already in the database
+            query = "SELECT MAX(match_id) FROM ttv_dota_matches WHERE account_id = $1"
+            cursor = await self.bot.pool.fetchval(query, self.account_id)
+        return cursor
+
+    async def fetch_new_matches(self, partial_user: PartialUser, cursor: int | None) -> list[MatchHistoryMatch]:
+        """Get matches newer than `cursor` (and `cutoff`) from the match history, newest first."""
+        cutoff_dt = datetime.datetime.now(datetime.UTC) - self.cutoff
+        new_matches: dict[int, MatchHistoryMatch] = {}
+        start_at_match_id = 0
+        for _ in range(self.max_pages):
+            page = await partial_user.match_history(start_at_match_id=start_at_match_id)
+            if not start_at_match_id and page:
+                self.latest_match = page[0]
+            # pages overlap by the match we start at
+            page = [history_match for history_match in page if history_match.id not in new_matches]
+            if not page:
+                break
+            for history_match in page:
+                if (cursor and history_match.id <= cursor) or history_match.start_time < cutoff_dt:
+                    return list(new_matches.values())
+                new_matches[history_match.id] = history_match
+            start_at_match_id = page[-1].id
+        else:
+            log.warning("Match history sync for %s stopped after %s pages.", self.account_id, self.max_pages)
+        return list(new_matches.values())
+
+    async def exclude_known(self, history_matches: list[MatchHistoryMatch]) -> list[MatchHistoryMatch]:
+        """Drop matches that are already in the database, i.e. added by `update_last_game` or a failed sync."""
+        if not history_matches:
+            return history_matches
+        query = "SELECT match_id FROM ttv_dota_matches WHERE account_id = $1 AND match_id = ANY($2::bigint[])"
+        rows = await self.bot.pool.fetch(query, self.account_id, [match.id for match in history_matches])
+        known = {row["match_id"] for row in rows}
+        return [match for match in history_matches if match.id not in known]
+
+    async def fetch_minimal(self, history_match: MatchHistoryMatch) -> SyncedMatch:
+        async with self._semaphore:
+            partial_match = self.bot.dota.instantiate_partial_match(history_match.id)
+            minimal_match = await partial_match.minimal()
+        outcome = PlayerMatchOutcome.create_from_history(minimal_match, history_match)
+        return SyncedMatch(history_match, minimal_match, outcome)
+
+    async def save(self, synced: list[SyncedMatch], cursor: int | None) -> None:
+        rows = [MatchRow.from_history(match.history_match, self.account_id, match.outcome) for match in synced]
+        async with self.repository.transaction() as connection:
+            await self.repository.upsert(rows, connection=connection)
+            if cursor is not None:
+                query = """
+                    INSERT INTO ttv_dota_history_cursors (account_id, last_match_id, synced_at)
+                    VALUES ($1, $2, NOW())
+                    ON CONFLICT (account_id) DO UPDATE
+                        SET last_match_id = GREATEST(
+                                ttv_dota_history_cursors.last_match_id, excluded.last_match_id
+                            ),
+                            synced_at = excluded.synced_at
+                """
+                await connection.execute(query, self.account_id, cursor)
+
+    async def sync(self) -> list[SyncedMatch]:
+        """Sync new matches into the database.
+
+        Returns
+        -------
+        list[SyncedMatch]
+            Newly synced matches, newest first.
+        """
+        start = perf_counter()
+        cursor = await self.get_cursor()
+        partial_user = self.bot.dota.instantiate_partial_user(self.account_id)
+        history_matches = await self.fetch_new_matches(partial_user, cursor)
+        new_matches = await self.exclude_known(history_matches)
+
+        results = await asyncio.gather(*(self.fetch_minimal(match) for match in new_matches), return_exceptions=True)
+        synced: list[SyncedMatch] = []
+        failed_ids: list[int] = []
+        for history_match, result in zip(new_matches, results, strict=True):
+            if isinstance(result, BaseException):
+                log.warning("Failed to fetch minimal data for match %s: %r", history_match.id, result)
+                failed_ids.append(history_match.id)
+            else:
+                synced.append(result)
+
+        # the cursor must not skip over failed matches
+        oldest_failed = min(failed_ids, default=None)
+        new_cursor = max(
+            (match.id for match in history_matches if oldest_failed is None or match.id < oldest_failed),
+            default=cursor,
+        )
+        await self.save(synced, new_cursor)
+
+        log.info(
+            "Synced %s/%s new matches for %s in %.3fs (cursor %s -> %s).",
+            len(synced),
+            len(new_matches),
+            self.account_id,
+            perf_counter() - start,
+            cursor,
+            new_cursor,
+        )
+        return synced
@@ -7,21 +7,27 @@ import itertools
 import logging
 from typing import TYPE_CHECKING, TypedDict, override
 
+import discord
 from steam import ID
 from steam.ext.dota2 import GameMode, Hero, LobbyType
-from thefuzz import process
 
 from bot import irenes_loop
-from utils import errors, formats
+from utils import const, errors, formats
 
 from .constants import HERO_ALIASES, PLAYER_COLOURS
 from .enums import LobbyParam0, PlayerMatchOutcome, RPStatus, Team, WinLossCategory
+from .history import MatchHistorySync
+from .repository import MatchRepository, MatchRow
+from .sessions import SessionStore
 from .utils import convert_id3_to_id64, rank_medal_display_name
 
 if TYPE_CHECKING:
-    from steam.ext.dota2 import MatchHistoryMatch, MatchMinimal
+    from collections.abc import Iterator
+
+    from steam.ext.dota2 import LiveMatch, MatchHistoryMatch, MatchMinimal, ProfileCard
 
     from bot import IrenesBot
+    from utils.dota.schemas import SteamWebAPI
 
     type ActiveMatch = PlayMatch | WatchMatch
 
@@ -29,12 +35,6 @@ if TYPE_CHECKING:
         match_id: int
         hero_id: int
 
-    class WLResponseQuery(TypedDict):
-        game_mode: int
-        lobby_type: int
-        start_time: datetime.datetime
-        outcome: int
-
     class MMRCommandQuery(TypedDict):
         mmr: int
         medal: str
@@ -43,16 +43,40 @@ if TYPE_CHECKING:
         match_id: int
         team: int
 
+    class LoadStreamersQueryRow(TypedDict):
+        account_id: int
+        twitch_id: str
+        twitch_name: str
+        debug: bool
+
 
-__all__ = ("Streamer",)
+__all__ = (
+    "Streamer",
+    "StreamerRegistry",
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+# every streamer has at most one live match, so more match tasks than that means some matches were never reset
+MAX_LIVE_MATCH_TASKS = 50
+
 
 class Streamer:
-    def __init__(self, bot: IrenesBot, steam_id64: int) -> None:
+    def __init__(
+        self,
+        bot: IrenesBot,
+        steam_id64: int,
+        *,
+        twitch_id: str = const.UserID.Irene,
+        twitch_name: str = const.LowerName.Irene,
+        debug: bool = False,
+    ) -> None:
         self.bot: IrenesBot = bot
+        self.twitch_id: str = twitch_id
+        self.twitch_name: str = twitch_name
+        # whether the channel opted in for `[debug]` messages about rich presence and match data
+        self.debug: bool = debug
 
         self.steam_id64: int = steam_id64
         self.account_id: int = ID(steam_id64).id
@@ -66,6 +90,10 @@ class Streamer:
 
         self.match_history_ready: bool = False
         self.unsupported_error: str = ""
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.sessions: SessionStore = SessionStore(bot, self.account_id)
+        self.matches: MatchRepository = MatchRepository(bot, sessions=self.sessions)
+        self.history_sync: MatchHistorySync = MatchHistorySync(bot, self.account_id, self.matches)
 
     @property
     def active_match(self) -> PlayMatch | WatchMatch | None:
@@ -75,7 +103,7 @@ class Streamer:
         log.debug("Resetting streamer state to play_match=`None`: %s", event_msg)
         if p := self.play_match:
             p.reset()
-            self.bot.dispatch("reset_streamer", event_msg)
+            self.bot.dispatch("reset_streamer", self, event_msg)
             if p.match_id and p.hero:
                 self.promised_match_ids[p.match_id] = p.hero
                 if not self.update_last_game.is_running():
@@ -83,13 +111,22 @@ class Streamer:
 
         elif w := self.watch_match:
             w.reset()
-            self.bot.dispatch("reset_streamer", event_msg)
+            self.bot.dispatch("reset_streamer", self, event_msg)
 
         self.play_match = None
         self.watch_match = None
         self.unsupported_error = unsupported_error
 
     async def update(self) -> None:
+        """Sync the state with streamer's rich presence.
+
+        Called on steam's user update events, by the watchdog loop and by commands, so it's guarded with a lock
+        to not let two of them create two matches at the same time.
+        """
+        async with self.lock:
+            await self._update()
+
+    async def _update(self) -> None:
         user = self.bot.dota.get_user(self.steam_id64)
         if not user:
             try:
@@ -108,7 +145,7 @@ class Streamer:
             if self.rp_status != rp_status:
                 self.rp_status = rp_status
                 self.reset("Streamer went Offline")
-                self.bot.dispatch("rich_presence_changed", self.rp_status.display_name)
+                self.bot.dispatch("rich_presence_changed", self, self.rp_status.display_name)
             return
 
         # this will bite me back one day, but "param1" is a hero level
@@ -131,7 +168,7 @@ class Streamer:
         if self.rp_status != rp_status:
             # Detected Rich Presence change;
             # only debug purpose since code still goes further
-            self.bot.dispatch("rich_presence_changed", rp_status)
+            self.bot.dispatch("rich_presence_changed", self, rp_status)
             log.debug("RPStatus changed to `%s`", rp_status.display_name)
 
         self.rp_status = rp_status
@@ -168,44 +205,34 @@ class Streamer:
                     # all is good
                     if not self.play_match:
                         # started playing new match
-                        self.play_match = PlayMatch(self.bot, watchable_game_id, self.account_id)
+                        self.play_match = PlayMatch(self.bot, self, watchable_game_id)
                     elif self.play_match.watchable_game_id != watchable_game_id:
                         self.reset("Started new match bypassing Menu")
                         # started playing new match right so fast after bypassing Menu
-                        self.play_match = PlayMatch(self.bot, watchable_game_id, self.account_id)
+                        self.play_match = PlayMatch(self.bot, self, watchable_game_id)
 
             case RPStatus.Spectating:
                 watching_server = rich_presence.get("watching_server")
                 if watching_server is None:
                     msg = f"RP is Playing but {watching_server=}"
                     raise errors.PlaceholderRaiseError(msg)
-                else:
-                    self.watch_match = WatchMatch(self.bot, watching_server)
+                elif not self.watch_match or self.watch_match.watching_server != watching_server:
+                    if self.watch_match:
+                        self.watch_match.reset()
+                    self.watch_match = WatchMatch(self.bot, self, watching_server)
             case _:
                 self.reset("Unknown to the bot Steam Status.")
 
-    async def add_completed_match_to_database(
-        self, history_match: MatchHistoryMatch
-    ) -> tuple[MatchMinimal, PlayerMatchOutcome]:
+    async def add_completed_match(self, history_match: MatchHistoryMatch) -> tuple[MatchMinimal, PlayerMatchOutcome]:
+        """Get the outcome of the completed match and buffer it in `matches`.
+
+        The match is not written into the database until `matches.flush()`.
+        """
         partial_match = self.bot.dota.instantiate_partial_match(history_match.id)
         minimal_match = await partial_match.minimal()
 
         outcome = PlayerMatchOutcome.create_from_history(minimal_match, history_match)
-        query = """
-            INSERT INTO ttv_dota_matches
-            (match_id, account_id, hero_id, game_mode, lobby_type, start_time, outcome)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
-        """
-        await self.bot.pool.execute(
-            query,
-            history_match.id,
-            self.account_id,
-            history_match.hero.id,
-            history_match.game_mode.value,
-            history_match.lobby_type.value,
-            history_match.start_time,
-            outcome.value,
-        )
+        self.matches.add(MatchRow.from_history(history_match, self.account_id, outcome))
         return minimal_match, outcome
 
     async def update_mmr(self, mmr_change: int) -> None:
@@ -232,7 +259,7 @@ class Streamer:
             if history_match is None:
                 continue
             try:
-                minimal_match, outcome = await self.add_completed_match_to_database(history_match)
+                minimal_match, outcome = await self.add_completed_match(history_match)
             except TimeoutError:
                 continue
             last_game = LastGame(minimal_match, outcome, self.account_id, hero)
@@ -242,7 +269,8 @@ class Streamer:
             mmr_change += outcome.mmr_change(last_game.lobby_type)
             matches_to_pop.append(match_id)
 
-        # 2. UPDATE MMR AND RANK_TIER
+        # 2. WRITE MATCHES, UPDATE MMR AND RANK_TIER
+        await self.matches.flush()
         await self.update_mmr(mmr_change)
 
         # 3. Clear promised matches
@@ -262,43 +290,23 @@ class Streamer:
         """
         log.debug("`fix_match_history` is starting.")
 
-        # 0. Delta mmr to apply in the end after all fixing
-        mmr_change: int = 0
+        # 0. Gaming session aggregates need to be loaded before new matches are added into them
+        await self.sessions.load()
 
-        # 1. Fetch last known match_id with a valid result.
-        query = """
-            SELECT match_id
-            FROM ttv_dota_matches
-            WHERE account_id = $1
-            ORDER BY match_id DESC
-            LIMIT 1
-        """
-        last_known_match_id: int | None = await self.bot.pool.fetchval(query, self.account_id)
+        # 1. Sync matches played since the last sync into the database
+        synced = await self.history_sync.sync()
+        mmr_change = sum(match.outcome.mmr_change(match.history_match.lobby_type) for match in synced)
 
-        # 2. Fill in Last Game from Match History.
-        partial_user = self.bot.dota.instantiate_partial_user(self.account_id)
-        history_matches = await partial_user.match_history(start_at_match_id=0)
-        latest_match = await history_matches[0].minimal()
-        latest_outcome = PlayerMatchOutcome.create_from_history(latest_match, history_matches[0])
-
-        self.last_game = LastGame(latest_match, latest_outcome, self.account_id, history_matches[0].hero)
-
-        # 3. Look in match history to get unknown recently played games.
-        cutoff_dt = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=48)
-        while True:  # monkaGIGA
-            for history_match in history_matches:
-                if (
-                    last_known_match_id and history_match.id <= last_known_match_id
-                ) or history_match.start_time < cutoff_dt:
-                    break
-                _, outcome = await self.add_completed_match_to_database(history_match)
-                mmr_change += outcome.mmr_change(history_match.lobby_type)
-            else:  # only executed if the inner loop did NOT break, always forget...
-                # need to queue more :o
-                history_matches = await partial_user.match_history(start_at_match_id=history_matches[-1].id)
-            break  # only executed if the inner loop DID break
-
-        # 4. Finally make mmr changes into the database
+        # 2. Fill in Last Game from Match History
+        if synced and synced[0].history_match is self.history_sync.latest_match:
+            latest = synced[0]
+            self.last_game = LastGame(latest.minimal_match, latest.outcome, self.account_id, latest.history_match.hero)
+        elif history_match := self.history_sync.latest_match:
+            latest_match = await history_match.minimal()
+            latest_outcome = PlayerMatchOutcome.create_from_history(latest_match, history_match)
+            self.last_game = LastGame(latest_match, latest_outcome, self.account_id, history_match.hero)
+
+        # 3. Finally make mmr changes into the database
         await self.update_mmr(mmr_change)
 
         self.match_history_ready = True
@@ -308,33 +316,7 @@ class Streamer:
         if not self.match_history_ready:
             return "Match history is not ready yet."
 
-        query = """
-            SELECT game_mode, lobby_type, outcome, start_time
-            FROM ttv_dota_matches
-            WHERE account_id = $1
-            ORDER BY start_time DESC
-        """
-        db_games: list[WLResponseQuery] = await self.bot.pool.fetch(query, self.account_id)
-
-        # find last gaming session
-        mapping: dict[WinLossCategory, list[int]] = {}
-        # this will be dict[WLCategory, [amount_of_losses, amount_of_wins]]
-        # or better to say value[0] is losses, [1] is wins
-        loop_dt = datetime.datetime.now(datetime.UTC)
-        for game in db_games:
-            if game["outcome"] not in (PlayerMatchOutcome.Win, PlayerMatchOutcome.Loss):
-                continue
-            if game["start_time"] < loop_dt - datetime.timedelta(hours=6):
-                break
-            else:
-                # tha match is included into current gaming session
-                loop_dt = game["start_time"]
-                category = WinLossCategory.create(game["lobby_type"], game["game_mode"])
-                mapping.setdefault(category, [0, 0])[int(game["outcome"])] += 1
-
-        if not mapping:
-            return "0 W - 0 L"
-        return " \N{BULLET} ".join(f"{category.name} {wl[1]} W - {wl[0]} L" for category, wl in mapping.items())
+        return self.sessions.wl_response()
 
     async def mmr_command_response(self) -> str:
         query = "SELECT mmr, medal FROM ttv_dota_streamers WHERE account_id = $1"
@@ -342,6 +324,75 @@ class Streamer:
         return f"[Placeholder number, haven't played ranked since 2021] {row['mmr']} \N{BULLET} {row['medal']}"
 
 
+class StreamerRegistry:
+    """Dota 2 streamers tracked by the bot.
+
+    Streamers are loaded from `ttv_dota_streamers` table. All of them share the bot's Dota 2 client,
+    profile cards batcher/cache and Steam Web API client (with its rate limiter).
+    Commands are routed to the streamer by the twitch channel they are used in, see `for_channel`.
+    """
+
+    def __init__(self, bot: IrenesBot) -> None:
+        self.bot: IrenesBot = bot
+        self.by_twitch_id: dict[str, Streamer] = {}
+        self.by_steam_id64: dict[int, Streamer] = {}
+
+    def __iter__(self) -> Iterator[Streamer]:
+        return iter(self.by_twitch_id.values())
+
+    def __len__(self) -> int:
+        return len(self.by_twitch_id)
+
+    def add(self, streamer: Streamer) -> None:
+        self.by_twitch_id[streamer.twitch_id] = streamer
+        self.by_steam_id64[streamer.steam_id64] = streamer
+
+    async def load(self) -> None:
+        """Add streamers from the database table, already tracked ones are kept as they are."""
+        query = "SELECT account_id, twitch_id, twitch_name, debug FROM ttv_dota_streamers"
+        rows: list[LoadStreamersQueryRow] = await self.bot.pool.fetch(query)
+        for row in rows:
+            if streamer := self.by_twitch_id.get(row["twitch_id"]):
+                streamer.debug = row["debug"]
+                continue
+            streamer = Streamer(
+                self.bot,
+                ID(row["account_id"]).id64,
+                twitch_id=row["twitch_id"],
+                twitch_name=row["twitch_name"],
+                debug=row["debug"],
+            )
+            self.add(streamer)
+        log.debug("Tracking %s Dota 2 streamer(s).", len(self))
+
+    def get_by_steam_id(self, steam_id64: int) -> Streamer | None:
+        return self.by_steam_id64.get(steam_id64)
+
+    def for_channel(self, broadcaster_id: str) -> Streamer:
+        """Get the streamer whose channel the command is used in."""
+        try:
+            return self.by_twitch_id[broadcaster_id]
+        except KeyError:
+            msg = "Dota 2 commands are not set up for this channel."
+            raise errors.UsageError(msg) from None
+
+    async def update_all(self) -> None:
+        """Sync rich presence of all streamers concurrently.
+
+        One streamer failing doesn't stop the others, errors are reported separately for each of them.
+        """
+        streamers = list(self)
+        results = await asyncio.gather(*(streamer.update() for streamer in streamers), return_exceptions=True)
+        for streamer, result in zip(streamers, results, strict=True):
+            if isinstance(result, Exception):
+                embed = (
+                    discord.Embed(title="Streamer.update", colour=0x1a7a8a)
+                    .set_author(name=f"{__name__}: StreamerRegistry.update_all")
+                    .set_footer(text=f"streamer: {streamer.twitch_name}")
+                )
+                await self.bot.exc_manager.register_error(result, embed)
+
+
 class LastGame:
     def __init__(self, match: MatchMinimal, outcome: PlayerMatchOutcome, account_id: int, hero: Hero) -> None:
         # print(match.id, [player.hero for player in match.players])
@@ -401,23 +452,20 @@ class Player:
         self.medal: str | None = None
         self.is_data_ready: bool = False
 
-        self.update.start()
+        # profile cards of the whole match are fetched together, see `ProfileCardBatcher`
+        self.bot.profile_cards.request(self.account_id, self.set_profile_card)
 
     @override
     def __repr__(self) -> str:
         return f"<Player id={self.account_id} hero={self.hero.name}"
 
-    @irenes_loop(seconds=5, count=12)
-    async def update(self) -> None:
-        partial_user = self.bot.dota.instantiate_partial_user(self.account_id)
-        profile_card = await partial_user.dota2_profile_card()
-
+    def set_profile_card(self, profile_card: ProfileCard) -> None:
         self.lifetime_games = profile_card.lifetime_games
         self.medal = rank_medal_display_name(profile_card)
+        self.is_data_ready = True
 
-        if self.medal:
-            self.is_data_ready = True
-            self.update.stop()
+    def reset(self) -> None:
+        self.bot.profile_cards.discard(self.account_id, self.set_profile_card)
 
     @property
     def identifier(self) -> str:
@@ -443,11 +491,13 @@ class Match(abc.ABC):
     def __init__(
         self,
         bot: IrenesBot,
+        streamer: Streamer,
         is_watch: bool,
         *,
         unsupported_error: str = "",
     ) -> None:
         self.bot: IrenesBot = bot
+        self.streamer: Streamer = streamer
         self.is_watch: bool = is_watch
 
         self.match_id: int | None = None
@@ -505,7 +555,9 @@ class Match(abc.ABC):
             if not 0 <= player_slot <= 9:
                 return "Sorry, player_slot can only be of 1-10 values."
         else:
-            # we have to use the fuzzy search
+            # we have to use the fuzzy search (imported here since it's only needed for this rarely used command)
+            from thefuzz import process
+
             the_choice = (None, 0)
             # first let's look in more official identifiers
             heroes = [player.hero for player in self.players.values()]
@@ -554,6 +606,15 @@ class Match(abc.ABC):
         response_parts = (prefix, net_worth, kda, cs, items, link)
         return " \N{BULLET} ".join(response_parts)
 
+    async def refresh(self) -> None:
+        """Poll the live data right now instead of waiting for the next `LiveMatchPoller` tick."""
+        await self.bot.live_matches.poll()
+
+    def reset_players(self) -> None:
+        if self.players:
+            for player in self.players.values():
+                player.reset()
+
     @abc.abstractmethod
     async def played_with(self, last_game: LastGame) -> str: ...
 
@@ -563,8 +624,8 @@ class PlayMatch(Match):
 
     Parameters
     ----------
-    account_id:
-        Streamer's steam_id32 id.
+    streamer:
+        The streamer playing the match.
     watchable_game_id:
         Used to compare...
     """
@@ -575,102 +636,76 @@ class PlayMatch(Match):
     def __init__(
         self,
         bot: IrenesBot,
+        streamer: Streamer,
         watchable_game_id: str,
-        account_id: int,
     ) -> None:
-        super().__init__(bot, False)
+        super().__init__(bot, streamer, False)
         self.watchable_game_id: str = watchable_game_id
         self.lobby_id: int = int(watchable_game_id)
-        self.account_id: int = account_id
+        self.account_id: int = streamer.account_id
 
         self.hero: Hero | None = None
         self.average_mmr: int | None = None
         self.team: Team | None = None
 
-        self.update_data.start()
+        self.bot.live_matches.watch_lobby(self.lobby_id, self.update_data)
 
     def reset(self) -> None:
-        self.update_data.cancel()
-        self.update_heroes.cancel()
+        self.bot.live_matches.unwatch_lobby(self.lobby_id, self.update_data)
         self.check_players.cancel()
-        if self.players:
-            for player in self.players.values():
-                player.update.cancel()
-
-    @irenes_loop(seconds=10, count=30)
-    async def update_data(self) -> None:
-        log.debug("Task `update_data` starts now: iteration=%s", self.update_data.current_loop)
-        match = next(iter(await self.bot.dota.live_matches(lobby_ids=[self.lobby_id])), None)
-        if not match:
-            msg = "FindTopSourceTVGames didn't find such match."
-            raise errors.PlaceholderRaiseError(msg)
-
-        # match data
-        self.server_steam_id = match.server_steam_id
-        self.match_id = match.id
-        self.average_mmr = match.average_mmr
-        self.lobby_type = match.lobby_type
-        self.game_mode = match.game_mode
-
-        # players
-        self.players = {
-            gc_player.id: Player(self.bot, gc_player.id, gc_player.hero.id, player_slot)
-            for player_slot, gc_player in enumerate(match.players)
-        }
-        log.debug("Received Players in the match: %s", self.players)
-
-        if self.update_data.current_loop == 0:
-            if not self.check_heroes():
-                self.update_heroes.start()
-
-            self.check_players.start()
-
-        if self.game_mode:
-            self.update_data.stop()
-
-    @irenes_loop(seconds=10, count=30)
+        self.reset_players()
+
+    def update_data(self, match: LiveMatch) -> None:
+        """Fill the match with fresh data from `LiveMatchPoller`."""
+        if not self.game_mode:
+            # match data
+            self.server_steam_id = match.server_steam_id
+            self.match_id = match.id
+            self.average_mmr = match.average_mmr
+            self.lobby_type = match.lobby_type
+            self.game_mode = match.game_mode
+
+            # players
+            self.reset_players()
+            self.players = {
+                gc_player.id: Player(self.bot, gc_player.id, gc_player.hero.id, player_slot)
+                for player_slot, gc_player in enumerate(match.players)
+            }
+            log.debug("Received Players in the match: %s", self.players)
+
+            if not self.check_players.is_running():
+                self.check_players.start()
+        elif self.players:
+            for gc_player in match.players:
+                player = self.players.get(gc_player.id)
+                if player and not player.hero:
+                    # need to fill the missing data in case previous times we got zeros
+                    player.hero = gc_player.hero
+
+        if not self.is_hero_ready:
+            self.check_heroes()
+        if self.game_mode and self.is_hero_ready:
+            # nothing else to wait for from live data
+            self.bot.live_matches.unwatch_lobby(self.lobby_id, self.update_data)
+
+    @irenes_loop(seconds=10, count=30, category="live_match", max_tasks=MAX_LIVE_MATCH_TASKS)
     async def check_players(self) -> None:
         log.debug("Task `check_players` starts now: iteration=%s", self.check_players.current_loop)
         if self.players and all(player.is_data_ready for player in self.players.values()):
             # match data is ready
             self.is_data_ready = True
-            self.bot.dispatch("match_data_ready")
+            self.bot.dispatch("match_data_ready", self.streamer)
             self.check_players.stop()
 
     def check_heroes(self) -> bool:
         if self.players and all(bool(player.hero) for player in self.players.values()):
             self.is_hero_ready = True
             self.hero = next(player.hero for player in self.players.values() if player.account_id == self.account_id)
-            self.bot.dispatch("match_hero_ready")
+            self.bot.dispatch("match_hero_ready", self.streamer)
             return True
         else:
             return False
 
-    # count exists to prevent potential infinite loop ?
-    # i'm not sure how it behaves when the object is null'ed.
-    @irenes_loop(seconds=10, count=30)
-    async def update_heroes(self) -> None:
-        log.debug("Task `update_heroes` starts now: iteration=%s", self.update_heroes.current_loop)
-        if self.update_heroes.current_loop == 0:
-            return
-
-        match = next(iter(await self.bot.dota.live_matches(lobby_ids=[self.lobby_id])), None)
-        if not match:
-            msg = "FindTopSourceTVGames didn't find such match."
-            raise errors.PlaceholderRaiseError(msg)
-        if not self.players:
-            msg = f"Somehow update_heroes was started with {self.players=}."
-            raise errors.PlaceholderRaiseError(msg)
-
-        for gc_player in match.players:
-            player = self.players[gc_player.id]
-            if not player.hero:
-                # need to fill the missing data in case previous times we got zeros
-                player.hero = gc_player.hero
-
-        if self.check_heroes():
-            self.update_heroes.stop()
-
     @override
     def game_medals(self) -> str:
         mmr_notice = f"[{self.average_mmr} avg] " if self.average_mmr else ""
@@ -702,76 +737,65 @@ class WatchMatch(Match):
     * have valid `server_steam_id` in Rich Presence
     """
 
-    def __init__(self, bot: IrenesBot, watching_server: str) -> None:
-        super().__init__(bot, True)
+    def __init__(self, bot: IrenesBot, streamer: Streamer, watching_server: str) -> None:
+        super().__init__(bot, streamer, True)
         self.watching_server: str = watching_server
         self.server_steam_id: int = convert_id3_to_id64(watching_server)
 
-    def reset(self) -> None:
-        self.update_data.cancel()
-        self.update_heroes.cancel()
-
-    @irenes_loop(seconds=10, count=30)
-    async def update_data(self) -> None:
-        match = await self.bot.steam_web_api.get_real_time_stats(self.server_steam_id)
-
-        # match data
-        self.match_id = int(match["match"]["match_id"])
-        self.lobby_type = LobbyType.try_value(match["match"]["lobby_type"])
-        self.game_mode = GameMode.try_value(match["match"]["game_mode"])
-
-        # players
-        self.players = {
-            api_player["accountid"]: Player(self.bot, api_player["accountid"], api_player["heroid"], player_slot)
-            for player_slot, api_player in enumerate(
-                itertools.chain(match["teams"][0]["players"], match["teams"][1]["players"])
-            )
-        }
-        if self.update_data.current_loop == 0:
-            if not self.check_heroes():
-                self.update_heroes.start()
-
-            self.check_players.start()
-
-        if self.game_mode:
-            self.update_data.stop()
+        self.bot.live_matches.watch_server(self.server_steam_id, self.update_data)
 
-    @irenes_loop(seconds=10, count=30)
+    def reset(self) -> None:
+        self.bot.live_matches.unwatch_server(self.server_steam_id, self.update_data)
+        self.check_players.cancel()
+        self.reset_players()
+
+    def update_data(self, match: SteamWebAPI.RealtimeStats) -> None:
+        """Fill the match with fresh data from `LiveMatchPoller`."""
+        api_players = list(itertools.chain(match["teams"][0]["players"], match["teams"][1]["players"]))
+        if not self.game_mode:
+            # match data
+            self.match_id = int(match["match"]["match_id"])
+            self.lobby_type = LobbyType.try_value(match["match"]["lobby_type"])
+            self.game_mode = GameMode.try_value(match["match"]["game_mode"])
+
+            # players
+            self.reset_players()
+            self.players = {
+                api_player["accountid"]: Player(self.bot, api_player["accountid"], api_player["heroid"], player_slot)
+                for player_slot, api_player in enumerate(api_players)
+            }
+
+            if not self.check_players.is_running():
+                self.check_players.start()
+        elif self.players:
+            for api_player in api_players:
+                player = self.players.get(api_player["accountid"])
+                if player and not player.hero:
+                    # need to fill the missing data in case previous times we got zeros
+                    player.hero = Hero.try_value(api_player["heroid"])
+
+        if not self.is_hero_ready:
+            self.check_heroes()
+        if self.game_mode and self.is_hero_ready:
+            # nothing else to wait for from live data
+            self.bot.live_matches.unwatch_server(self.server_steam_id, self.update_data)
+
+    @irenes_loop(seconds=10, count=30, category="live_match", max_tasks=MAX_LIVE_MATCH_TASKS)
     async def check_players(self) -> None:
         if self.players and all(player.is_data_ready for player in self.players.values()):
             # match data is ready
             self.is_data_ready = True
-            self.bot.dispatch("match_data_ready")
+            self.bot.dispatch("match_data_ready", self.streamer)
             self.check_players.stop()
 
     def check_heroes(self) -> bool:
         if self.players and all(bool(player.hero) for player in self.players.values()):
             self.is_hero_ready = True
-            self.bot.dispatch("match_hero_ready")
+            self.bot.dispatch("match_hero_ready", self.streamer)
             return True
         else:
             return False
 
-    @irenes_loop(seconds=10, count=30)
-    async def update_heroes(self) -> None:
-        if self.update_heroes.current_loop == 0:
-            return
-
-        if not self.players:
-            msg = f"Somehow update_heroes was started with {self.players=}."
-            raise errors.PlaceholderRaiseError(msg)
-
-        match = await self.bot.steam_web_api.get_real_time_stats(self.server_steam_id)
-
-        for api_player in itertools.chain(match["teams"][0]["players"], match["teams"][1]["players"]):
-            player = self.players[api_player["accountid"]]
-            if not player.hero:
-                # need to fill the missing data in case previous times we got zeros
-                self.players[api_player["accountid"]].hero = Hero.try_value(api_player["heroid"])
-
-        if self.check_heroes():
-            self.update_heroes.stop()
-
     @override
     async def played_with(self, _: LastGame | None) -> str:
         return "The command is not supported for spectated games."
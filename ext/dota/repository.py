@@ -0,0 +1,171 @@
+"""Match Repository.
+
+All writes into `ttv_dota_matches` go through `MatchRepository`: rows are buffered and then written in bulk
+via `COPY` into a staging table followed by one upsert, so writing 1 or 100 matches costs the same round-trips
+and writing the same match twice is harmless.
+Newly inserted matches are also added into gaming session aggregates (see `sessions.py`) in the same transaction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import AsyncGenerator
+
+    import asyncpg
+    from steam.ext.dota2 import MatchHistoryMatch
+
+    from bot import IrenesBot
+
+    from .enums import PlayerMatchOutcome
+    from .sessions import SessionStore
+
+
+__all__ = (
+    "MatchRepository",
+    "MatchRow",
+)
+
+log = logging.getLogger(__name__)
+
+
+class MatchRow(NamedTuple):
+    """Row of `ttv_dota_matches` table."""
+
+    match_id: int
+    account_id: int
+    hero_id: int
+    game_mode: int
+    lobby_type: int
+    start_time: datetime.datetime
+    outcome: int
+
+    @classmethod
+    def from_history(cls, history_match: MatchHistoryMatch, account_id: int, outcome: PlayerMatchOutcome) -> MatchRow:
+        return cls(
+            history_match.id,
+            account_id,
+            history_match.hero.id,
+            history_match.game_mode.value,
+            history_match.lobby_type.value,
+            history_match.start_time,
+            outcome.value,
+        )
+
+
+class MatchRepository:
+    """Bulk writer for `ttv_dota_matches`.
+
+    Example
+    -------
+    ```py
+    repository.add(MatchRow.from_history(history_match, account_id, outcome))
+    ...
+    await repository.flush()  # all buffered rows in one go
+    ```
+    """
+
+    STAGING_TABLE: str = "ttv_dota_matches_staging"
+
+    def __init__(self, bot: IrenesBot, *, sessions: SessionStore | None = None) -> None:
+        self.bot: IrenesBot = bot
+        self.buffer: list[MatchRow] = []
+        # gaming session aggregates to update with newly inserted matches
+        self.sessions: SessionStore | None = sessions
+        # one write transaction at a time, so session aggregates are never built on top of uncommitted ones
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    def add(self, row: MatchRow) -> None:
+        self.buffer.append(row)
+
+    async def flush(self, *, connection: asyncpg.Connection[asyncpg.Record] | None = None) -> list[MatchRow]:
+        """Write all buffered rows.
+
+        Returns
+        -------
+        list[MatchRow]
+            Rows that were inserted (and not just updated).
+        """
+        rows, self.buffer = self.buffer, []
+        try:
+            return await self.upsert(rows, connection=connection)
+        except Exception:
+            # keep the rows for the next flush
+            self.buffer = rows + self.buffer
+            raise
+
+    async def upsert(
+        self, rows: list[MatchRow], *, connection: asyncpg.Connection[asyncpg.Record] | None = None
+    ) -> list[MatchRow]:
+        """Insert the rows or update the existing ones.
+
+        If `connection` is provided then it's expected to come from `transaction()`,
+        i.e. so the rows are written together with something else.
+        """
+        if not rows:
+            return []
+        if connection is not None:
+            return await self._upsert(connection, rows)
+
+        async with self.transaction() as connection:
+            return await self._upsert(connection, rows)
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[asyncpg.Connection[asyncpg.Record], None]:
+        """Open a write transaction, the only one for the repository at a time.
+
+        In-memory changes made along with the upserts (session aggregates) are applied only if it's committed.
+        """
+        async with self.lock:
+            try:
+                async with self.bot.database.acquire() as connection, connection.transaction():
+                    yield connection
+            except BaseException:
+                if self.sessions:
+                    self.sessions.rollback()
+                raise
+            if self.sessions:
+                self.sessions.commit()
+
+    async def _upsert(self, connection: asyncpg.Connection[asyncpg.Record], rows: list[MatchRow]) -> list[MatchRow]:
+        # temporary tables live as long as the connection, so the pool's connections reuse it
+        await connection.execute(
+            f"""
+            CREATE TEMPORARY TABLE IF NOT EXISTS {self.STAGING_TABLE}
+            (LIKE ttv_dota_matches INCLUDING DEFAULTS)
+            ON COMMIT DELETE ROWS
+            """
+        )
+        columns = MatchRow._fields
+        await connection.copy_records_to_table(self.STAGING_TABLE, records=rows, columns=columns)
+
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[2:])
+        # `xmax = 0` is true for freshly inserted rows and false for updated ones
+        upserted = await connection.fetch(
+            f"""
+            INSERT INTO ttv_dota_matches ({column_list})
+            SELECT DISTINCT ON (match_id, account_id) {column_list}
+            FROM {self.STAGING_TABLE}
+            ON CONFLICT (match_id, account_id) DO UPDATE SET {updates}
+            RETURNING match_id, account_id, (xmax = 0) AS inserted
+            """
+        )
+        # `ON COMMIT DELETE ROWS` only clears the table at the end of the transaction
+        await connection.execute(f"TRUNCATE {self.STAGING_TABLE}")
+
+        inserted_keys = {(record["match_id"], record["account_id"]) for record in upserted if record["inserted"]}
+        inserted: dict[tuple[int, int], MatchRow] = {}
+        for row in rows:
+            if (key := (row.match_id, row.account_id)) in inserted_keys:
+                inserted[key] = row
+
+        if inserted and self.sessions:
+            await self.sessions.record(connection, inserted.values())
+        log.debug("Upserted %s/%s matches (%s new).", len(upserted), len(rows), len(inserted))
+        return list(inserted.values())
@@ -0,0 +1,239 @@
+"""Gaming Sessions.
+
+Win/loss aggregates of streamer's gaming sessions for `!wl` command.
+Gaming sessions are considered separated if there are at least 6 hours between their matches.
+
+The aggregates are kept in memory and in `ttv_dota_sessions` table and are updated incrementally by `MatchRepository`
+as matches are inserted, so `!wl` doesn't need to walk the match history.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from typing import TYPE_CHECKING, TypedDict
+
+from .enums import PlayerMatchOutcome, WinLossCategory
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import asyncpg
+
+    from bot import IrenesBot
+
+    from .repository import MatchRow
+
+    class SessionQueryRow(TypedDict):
+        session_start: datetime.datetime
+        last_match_time: datetime.datetime
+        category: int
+        wins: int
+        losses: int
+
+    class LatestSessionQueryRow(TypedDict):
+        lobby_type: int
+        game_mode: int
+        wins: int
+        losses: int
+        session_start: datetime.datetime
+        last_match_time: datetime.datetime
+
+
+__all__ = (
+    "SessionStore",
+    "fetch_latest_session",
+)
+
+log = logging.getLogger(__name__)
+
+SESSION_GAP = datetime.timedelta(hours=6)
+
+# `LAG()` pairs every match with the one played before it, so a gap longer than `SESSION_GAP` marks a session start;
+# the latest such start bounds the latest session which is then counted per `(lobby_type, game_mode)`.
+# Backed by `ix_ttv_dota_matches_account_id_start_time` index.
+LATEST_SESSION_QUERY = """
+    WITH games AS (
+        SELECT lobby_type, game_mode, outcome, start_time,
+            start_time - LAG(start_time) OVER (ORDER BY start_time) AS gap
+        FROM ttv_dota_matches
+        WHERE account_id = $1 AND outcome IN ($2, $3)
+    )
+    SELECT
+        lobby_type,
+        game_mode,
+        COUNT(*) FILTER (WHERE outcome = $3) AS wins,
+        COUNT(*) FILTER (WHERE outcome = $2) AS losses,
+        MIN(start_time) AS session_start,
+        MAX(start_time) AS last_match_time
+    FROM games
+    WHERE start_time >= (SELECT MAX(start_time) FROM games WHERE gap IS NULL OR gap > $4)
+    GROUP BY lobby_type, game_mode
+"""
+
+
+class SessionAggregate:
+    """Win/loss score of one gaming session."""
+
+    __slots__: tuple[str, ...] = ("last_match_time", "results", "session_start")
+
+    def __init__(self, session_start: datetime.datetime) -> None:
+        # `session_start` is the key of the session in the database, it never changes
+        self.session_start: datetime.datetime = session_start
+        self.last_match_time: datetime.datetime = session_start
+        self.results: dict[WinLossCategory, list[int]] = {}  # category -> [losses, wins]
+
+    def copy(self) -> SessionAggregate:
+        session = SessionAggregate(self.session_start)
+        session.last_match_time = self.last_match_time
+        session.results = {category: wl.copy() for category, wl in self.results.items()}
+        return session
+
+    def includes(self, start_time: datetime.datetime) -> bool:
+        return self.session_start - SESSION_GAP <= start_time <= self.last_match_time + SESSION_GAP
+
+    def is_active(self, now: datetime.datetime) -> bool:
+        return now - self.last_match_time <= SESSION_GAP
+
+    def add(self, category: WinLossCategory, outcome: PlayerMatchOutcome, start_time: datetime.datetime) -> None:
+        self.results.setdefault(category, [0, 0])[int(outcome)] += 1
+        self.last_match_time = max(self.last_match_time, start_time)
+
+    def response(self) -> str:
+        if not self.results:
+            return "0 W - 0 L"
+        return " \N{BULLET} ".join(f"{category.name} {wl[1]} W - {wl[0]} L" for category, wl in self.results.items())
+
+
+async def fetch_latest_session(
+    connection: asyncpg.Pool[asyncpg.Record] | asyncpg.Connection[asyncpg.Record], account_id: int
+) -> SessionAggregate | None:
+    """Count the latest gaming session of the account straight from `ttv_dota_matches`."""
+    rows: list[LatestSessionQueryRow] = await connection.fetch(
+        LATEST_SESSION_QUERY,
+        account_id,
+        PlayerMatchOutcome.Loss.value,
+        PlayerMatchOutcome.Win.value,
+        SESSION_GAP,
+    )
+    if not rows:
+        return None
+
+    session = SessionAggregate(min(row["session_start"] for row in rows))
+    session.last_match_time = max(row["last_match_time"] for row in rows)
+    # a few `(lobby_type, game_mode)` rows fold into `WinLossCategory` here to keep `WinLossCategory.create` the only
+    # place that knows the mapping
+    for row in rows:
+        wl = session.results.setdefault(WinLossCategory.create(row["lobby_type"], row["game_mode"]), [0, 0])
+        wl[0] += row["losses"]
+        wl[1] += row["wins"]
+    return session
+
+
+class SessionStore:
+    """Gaming sessions aggregates of one account.
+
+    Only the latest session is kept in memory since it's the only one `!wl` is interested in.
+    Changes made by `record` stay `pending` until the surrounding transaction is over:
+    `commit` applies them to `current` and `rollback` drops them, so a rolled back insert is never counted.
+    `MatchRepository.transaction` runs one transaction at a time, so `pending` always belongs to the current one.
+    """
+
+    def __init__(self, bot: IrenesBot, account_id: int) -> None:
+        self.bot: IrenesBot = bot
+        self.account_id: int = account_id
+        self.current: SessionAggregate | None = None
+        # `current` with the matches recorded in a transaction that isn't committed yet
+        self.pending: SessionAggregate | None = None
+        self.loaded: bool = False
+
+    async def load(self) -> None:
+        """Load the latest session from the database (or build it from `ttv_dota_matches` if there is none yet)."""
+        query = """
+            SELECT session_start, last_match_time, category, wins, losses
+            FROM ttv_dota_sessions
+            WHERE account_id = $1 AND session_start = (
+                SELECT MAX(session_start) FROM ttv_dota_sessions WHERE account_id = $1
+            )
+        """
+        rows: list[SessionQueryRow] = await self.bot.pool.fetch(query, self.account_id)
+        if rows:
+            self.current = session = SessionAggregate(rows[0]["session_start"])
+            for row in rows:
+                session.last_match_time = max(session.last_match_time, row["last_match_time"])
+                session.results[WinLossCategory(row["category"])] = [row["losses"], row["wins"]]
+        else:
+            await self.rebuild()
+        self.loaded = True
+
+    async def rebuild(self) -> None:
+        """Build the latest session from the matches table. Only needed once, when the table is empty."""
+        session = await fetch_latest_session(self.bot.pool, self.account_id)
+        if session is None:
+            return
+
+        self.current = session
+        async with self.bot.database.acquire() as connection:
+            await self.save(connection, session)
+        log.info("Rebuilt the latest gaming session for %s (started %s).", self.account_id, session.session_start)
+
+    async def save(self, connection: asyncpg.Connection[asyncpg.Record], session: SessionAggregate) -> None:
+        query = """
+            INSERT INTO ttv_dota_sessions (account_id, session_start, category, last_match_time, wins, losses)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (account_id, session_start, category) DO UPDATE
+                SET last_match_time = excluded.last_match_time, wins = excluded.wins, losses = excluded.losses
+        """
+        await connection.executemany(
+            query,
+            [
+                (self.account_id, session.session_start, category.value, session.last_match_time, wl[1], wl[0])
+                for category, wl in session.results.items()
+            ],
+        )
+
+    async def record(self, connection: asyncpg.Connection[asyncpg.Record], rows: Iterable[MatchRow]) -> None:
+        """Add newly inserted matches into the session aggregates.
+
+        Called by `MatchRepository` within the same transaction as the insert.
+        The in-memory aggregate only changes on `commit`, so each match is counted exactly once.
+        """
+        if not self.loaded:
+            await self.load()
+
+        # `pending` can only come from an earlier upsert of this very transaction
+        base = self.pending or self.current
+        session = base.copy() if base else None
+        changed = False
+        for row in sorted(rows, key=lambda row: row.start_time):
+            outcome = PlayerMatchOutcome(row.outcome)
+            if not outcome.valid:
+                continue
+
+            if session is None or not session.includes(row.start_time):
+                if session and row.start_time < session.session_start:
+                    # a match from some older session, `!wl` is only interested in the latest one
+                    log.debug("Match %s is older than the current session, not aggregating.", row.match_id)
+                    continue
+                session = SessionAggregate(row.start_time)
+            session.add(WinLossCategory.create(row.lobby_type, row.game_mode), outcome, row.start_time)
+            changed = True
+
+        if changed and session:
+            await self.save(connection, session)
+            self.pending = session
+
+    def commit(self) -> None:
+        """The transaction with the recorded matches is committed."""
+        if self.pending:
+            self.current, self.pending = self.pending, None
+
+    def rollback(self) -> None:
+        """The transaction with the recorded matches is rolled back."""
+        self.pending = None
+
+    def wl_response(self) -> str:
+        session = self.current
+        if session is None or not session.is_active(datetime.datetime.now(datetime.UTC)):
+            return "0 W - 0 L"
+        return session.response()
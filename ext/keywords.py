@@ -2,25 +2,35 @@ from __future__ import annotations
 
 import datetime
 import random
-import re
-from typing import TYPE_CHECKING, TypedDict
+from typing import TYPE_CHECKING
 
-from twitchio.ext import commands
-
-from bot import IrenesComponent
-from utils import const
+from bot import IrenesComponent, message_matcher
+from utils.matchers import MultiPatternMatcher
 
 if TYPE_CHECKING:
-    import twitchio
+    from bot import ChatLine, IrenesBot
+
+
+class Keyword:
+    """A keyword/key phrase that the bot reacts to, together with its per-channel cooldown state."""
 
-    from bot import IrenesBot
+    __slots__: tuple[str, ...] = ("aliases", "cooldown", "last_dts", "response")
 
-    class KeywordDict(TypedDict):
-        """Schema for `self.keywords` elements."""
+    def __init__(
+        self,
+        aliases: list[str],
+        response: str,
+        *,
+        cooldown: datetime.timedelta = datetime.timedelta(minutes=10),
+    ) -> None:
+        self.aliases: list[str] = aliases
+        self.response: str = response
+        self.cooldown: datetime.timedelta = cooldown
+        self.last_dts: dict[str, datetime.datetime] = {}  # broadcaster_id -> last time the bot responded
 
-        aliases: list[str]
-        response: str
-        dt: datetime.datetime
+    def is_on_cooldown(self, broadcaster_id: str, now: datetime.datetime) -> bool:
+        last_dt = self.last_dts.get(broadcaster_id)
+        return last_dt is not None and now - last_dt < self.cooldown
 
 
 class Keywords(IrenesComponent):
@@ -31,35 +41,33 @@ class Keywords(IrenesComponent):
 
     def __init__(self, bot: IrenesBot) -> None:
         super().__init__(bot)
-        self.keywords: list[KeywordDict] = [
-            {
-                "aliases": aliases,
-                "response": response,
-                "dt": datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=1),
-            }
-            for aliases, response in [
-                (["Pog", "PogU"], "Pog"),
-                (["gg"], "gg"),
-                (["GG"], "GG"),
-                (
-                    ["Pepoga"],
-                    "Pepoga 📣 AAAIIIIIIIIIREEEEEEEEEEEEEEEENEE !",
-                ),  # # cSpell: ignore AAAIIIIIIIIIREEEEEEEEEEEEEEEENEE
-            ]
+        self.keywords: list[Keyword] = [
+            Keyword(["Pog", "PogU"], "Pog"),
+            Keyword(["gg"], "gg"),
+            Keyword(["GG"], "GG"),
+            Keyword(["Pepoga"], "Pepoga 📣 AAAIIIIIIIIIREEEEEEEEEEEEEEEENEE !"),  # cSpell: ignore AAAIIIIIIIIIREEEEEEEEEEEEEEEENEE
         ]
+        # all aliases of all keywords are compiled into one pattern, so one scan of the message is enough
+        self.matcher: MultiPatternMatcher[Keyword] = MultiPatternMatcher()
+        for keyword in self.keywords:
+            self.matcher.add_words(keyword, keyword.aliases)
+        self.matcher.compile()
 
-    @commands.Component.listener(name="message")
-    async def keywords_response(self, message: twitchio.ChatMessage) -> None:
+    @message_matcher()
+    async def keywords_response(self, line: ChatLine) -> None:
         """Sends a flavour message if a keyword/key phrase was spotted in the chat."""
-        if message.chatter.name in const.Bots or not message.text or random.randint(1, 100) > 5:
+        if not line.text or random.randint(1, 100) > 5:
+            return
+        channel = self.bot.channels.get(line.broadcaster_id)
+        if channel is None or not channel.keywords:
             return
 
         now = datetime.datetime.now(datetime.UTC)
-        for keyword in self.keywords:
-            for word in keyword["aliases"]:
-                if re.search(r"\b" + re.escape(word) + r"\b", message.text) and (now - keyword["dt"]).seconds > 600:
-                    await message.broadcaster.send_message(sender=self.bot.bot_id, message=keyword["response"])
-                    keyword["dt"] = now
+        for keyword in self.matcher.matches(line.text):
+            if keyword.is_on_cooldown(line.broadcaster_id, now):
+                continue
+            keyword.last_dts[line.broadcaster_id] = now
+            await line.message.broadcaster.send_message(sender=self.bot.bot_id, message=keyword.response)
 
 
 async def setup(bot: IrenesBot) -> None:
@@ -4,7 +4,7 @@ import asyncio
 import datetime
 import logging
 import textwrap
-from typing import TYPE_CHECKING, override
+from typing import TYPE_CHECKING, Any, override
 
 import discord
 from twitchio.ext import commands
@@ -57,14 +57,19 @@ class LogsViaWebhook(IrenesComponent):
     }
     DOLPHIN_IMAGE: str = "https://em-content.zobj.net/source/microsoft/407/dolphin_1f42c.png"
 
-    def __init__(self, bot: IrenesBot) -> None:
+    # discord message content limit
+    MESSAGE_LIMIT: int = 2000
+
+    def __init__(self, bot: IrenesBot, *, max_queue_size: int = 1000) -> None:
         super().__init__(bot)
-        self._logging_queue = asyncio.Queue()
+        # bounded, so a log storm doesn't eat memory - records that don't fit are counted in `dropped`
+        self._logging_queue: asyncio.Queue[logging.LogRecord] = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped: int = 0
 
-        # cooldown attrs
-        self._lock: asyncio.Lock = asyncio.Lock()
-        self.cooldown: datetime.timedelta = datetime.timedelta(seconds=5)
-        self._most_recent: datetime.datetime | None = None
+        # time to wait between batches, new records pile up in the queue in the meantime
+        self.cooldown: datetime.timedelta = datetime.timedelta(seconds=2)
+        # time to wait after the first record of the batch so records of the same burst are sent together
+        self.batch_window: datetime.timedelta = datetime.timedelta(seconds=0.5)
 
     @override
     async def component_load(self) -> None:
@@ -88,10 +93,13 @@ class LogsViaWebhook(IrenesComponent):
 
     def add_record(self, record: logging.LogRecord) -> None:
         """Add a record to a logging queue."""
-        self._logging_queue.put_nowait(record)
+        try:
+            self._logging_queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
 
-    async def send_log_record(self, record: logging.LogRecord) -> None:
-        """Send Log record to discord webhook."""
+    def format_record(self, record: logging.LogRecord, count: int) -> str:
+        """Format a record into a line of the webhook message."""
         attributes = {
             "INFO": "\N{INFORMATION SOURCE}\ufe0f",
             "WARNING": "\N{WARNING SIGN}\ufe0f",
@@ -99,26 +107,76 @@ class LogsViaWebhook(IrenesComponent):
         }
 
         emoji = attributes.get(record.levelname, "\N{WHITE QUESTION MARK ORNAMENT}")
-        dt = datetime.datetime.fromtimestamp(record.created, datetime.UTC)
-        msg = textwrap.shorten(f"{emoji} {discord.utils.format_dt(dt, style="T")} {record.message}", width=1995)
-        avatar_url = self.AVATAR_MAPPING.get(record.name, discord.utils.MISSING)
-        username = record.name.replace("discord", "disсοrd")  # cSpell: ignore disсοrd  # noqa: RUF003
-        await self.bot.logger_webhook.send(msg, username=username, avatar_url=avatar_url)
+        timestamp = discord.utils.format_dt(datetime.datetime.fromtimestamp(record.created, datetime.UTC), style="T")
+        repeats = f" (\N{MULTIPLICATION SIGN}{count})" if count > 1 else ""
+        line = textwrap.shorten(f"{emoji} {timestamp} {record.getMessage()}", width=self.MESSAGE_LIMIT - len(repeats))
+        return line + repeats
+
+    def pack_records(self, records: list[logging.LogRecord]) -> list[tuple[str, str]]:
+        """Pack records into as few webhook messages as possible.
+
+        * identical lines from the same logger are collapsed into one line with a counter;
+        * lines are grouped by logger name since it's used as webhook's username;
+        * lines are joined into messages up to `MESSAGE_LIMIT` characters.
+
+        Returns
+        -------
+        list[tuple[str, str]]
+            List of `(logger name, message content)`.
+        """
+        # (logger name, level, message) -> [first record, count]; dict keeps the order of the first appearance
+        unique: dict[tuple[str, int, str], list[Any]] = {}
+        for record in records:
+            key = (record.name, record.levelno, record.getMessage())
+            if key in unique:
+                unique[key][1] += 1
+            else:
+                unique[key] = [record, 1]
+
+        lines: dict[str, list[str]] = {}
+        for (name, _, _), (record, count) in unique.items():
+            lines.setdefault(name, []).append(self.format_record(record, count))
+
+        messages: list[tuple[str, str]] = []
+        for name, name_lines in lines.items():
+            content = ""
+            for line in name_lines:
+                if content and len(content) + 1 + len(line) > self.MESSAGE_LIMIT:
+                    messages.append((name, content))
+                    content = ""
+                content = f"{content}\n{line}" if content else line
+            messages.append((name, content))
+        return messages
+
+    async def send_log_message(self, name: str, content: str) -> None:
+        """Send packed log lines to discord webhook."""
+        avatar_url = self.AVATAR_MAPPING.get(name, discord.utils.MISSING)
+        username = name.replace("discord", "disсοrd")  # cSpell: ignore disсοrd  # noqa: RUF003
+        await self.bot.logger_webhook.send(content, username=username, avatar_url=avatar_url)
 
     @irenes_loop(seconds=0.0)
     async def logging_worker(self) -> None:
-        """Task responsible for mirroring logging messages to a discord webhook."""
-        record = await self._logging_queue.get()
+        """Task responsible for mirroring logging messages to a discord webhook.
+
+        Records are drained from the queue in batches so a burst of logs turns into a few messages.
+        """
+        records = [await self._logging_queue.get()]
+        await asyncio.sleep(self.batch_window.total_seconds())
+        while not self._logging_queue.empty():
+            records.append(self._logging_queue.get_nowait())
+
+        for name, content in self.pack_records(records):
+            await self.send_log_message(name, content)
 
-        async with self._lock:
-            if self._most_recent and (delta := datetime.datetime.now(datetime.UTC) - self._most_recent) < self.cooldown:
-                # We have to wait
-                total_seconds = delta.total_seconds()
-                log.debug("Waiting %s seconds to send the error.", total_seconds)
-                await asyncio.sleep(total_seconds)
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            await self.send_log_message(
+                __name__,
+                f"\N{WARNING SIGN}\ufe0f {dropped} log records were dropped because the queue was full.",
+            )
 
-            self._most_recent = datetime.datetime.now(datetime.UTC)
-            await self.send_log_record(record)
+        log.debug("Sent %s log records to the webhook.", len(records))
+        await asyncio.sleep(self.cooldown.total_seconds())
 
 
 async def setup(bot: IrenesBot) -> None:
@@ -127,6 +185,6 @@ async def setup(bot: IrenesBot) -> None:
         # check if the extension is listed in extensions
 
         cog = LogsViaWebhook(bot)
-        await bot.add_component(LogsViaWebhook(bot))
+        await bot.add_component(cog)
         bot.logs_via_webhook_handler = handler = LoggingHandler(cog)
         logging.getLogger().addHandler(handler)
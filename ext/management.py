@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 
 from twitchio.ext import commands
 
-from bot import IrenesComponent, irenes_loop
+from bot import IrenesComponent, PerChannel, irenes_loop
 from utils import const, errors, formats
 
 if TYPE_CHECKING:
@@ -14,14 +14,12 @@ if TYPE_CHECKING:
     from bot import IrenesBot
 
 
-class ChannelManagement(IrenesComponent):
-    """Channel Management commands.
+class TrackedChannel:
+    """Tracked channel info state of one channel."""
 
-    Such as change Game or Title.
-    """
+    __slots__: tuple[str, ...] = ("game_tracked", "game_updated_dt", "title_tracked", "title_updated_dt")
 
-    def __init__(self, bot: IrenesBot) -> None:
-        super().__init__(bot)
+    def __init__(self, _: str) -> None:
         self.game_tracked: str = "idk"
         self.title_tracked: str = "idk"
 
@@ -29,21 +27,31 @@ class ChannelManagement(IrenesComponent):
         self.game_updated_dt: datetime.datetime = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=1)
         self.title_updated_dt: datetime.datetime = datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=1)
 
+
+class ChannelManagement(IrenesComponent):
+    """Channel Management commands.
+
+    Such as change Game or Title.
+    """
+
+    def __init__(self, bot: IrenesBot) -> None:
+        super().__init__(bot)
+        self.tracked: PerChannel[TrackedChannel] = PerChannel(TrackedChannel)
         self.start_tracking.start()
 
     @irenes_loop(count=1)
     async def start_tracking(self) -> None:
-        """Start tracking my channel info.
+        """Start tracking channel info of all channels.
 
         Unfortunately, twitch eventSub payloads for channel update events do not have before/after and
         do not say what exactly changed, they just send new stuff in.
 
         This is why we need to track the past ourselves.
         """
-        channel_info = await self.irene.fetch_channel_info()
-
-        self.game_tracked = channel_info.game_name
-        self.title_tracked = channel_info.title
+        for channel_info in await self.bot.fetch_channels(broadcaster_ids=list(self.bot.channels)):
+            tracked = self.tracked[channel_info.user.id]
+            tracked.game_tracked = channel_info.game_name
+            tracked.title_tracked = channel_info.title
 
     @commands.command()
     async def game(self, ctx: commands.Context, *, game_name: str | None = None) -> None:
@@ -66,7 +74,7 @@ class ChannelManagement(IrenesComponent):
 
         if game_name.lower() == "clear":
             # b. A keyword to clear the game category, sets it uncategorised
-            self.game_updated_dt = datetime.datetime.now(datetime.UTC)
+            self.tracked[ctx.broadcaster.id].game_updated_dt = datetime.datetime.now(datetime.UTC)
             await ctx.broadcaster.modify_channel(game_id="0")
             await ctx.send(f'Set game to "No game category" {const.STV.uuh}')
             return
@@ -84,14 +92,14 @@ class ChannelManagement(IrenesComponent):
             await ctx.send(f"Couldn't find any games with such a name {const.STV.How2Read}")
             return
 
-        self.game_updated_dt = datetime.datetime.now(datetime.UTC)
+        self.tracked[ctx.broadcaster.id].game_updated_dt = datetime.datetime.now(datetime.UTC)
         await ctx.broadcaster.modify_channel(game_id=game.id)
         await ctx.send(f'Changed game to "{game.name}" {const.STV.DankMods}')
         return
 
     async def update_title(self, streamer: twitchio.PartialUser, title: str) -> None:
         """Helper function to update the streamer's title."""
-        self.title_updated_dt = datetime.datetime.now(datetime.UTC)
+        self.tracked[streamer.id].title_updated_dt = datetime.datetime.now(datetime.UTC)
         await streamer.modify_channel(title=title)
         # try:
         #     await streamer.modify_channel(title=title)
@@ -156,11 +164,12 @@ class ChannelManagement(IrenesComponent):
         """
         query = """
             SELECT title FROM ttv_stream_titles
+            WHERE broadcaster_id = $1
             ORDER BY edit_time DESC
             LIMIT 1
-            OFFSET $1;
+            OFFSET $2;
         """
-        title: str | None = await self.bot.pool.fetchval(query, offset)
+        title: str | None = await self.bot.pool.fetchval(query, ctx.broadcaster.id, offset)
         if title is None:
             await ctx.send("No change: the database doesn't keep such title.")
         else:
@@ -180,11 +189,12 @@ class ChannelManagement(IrenesComponent):
         """
         query = """
             SELECT title FROM ttv_stream_titles
+            WHERE broadcaster_id = $1
             ORDER BY edit_time DESC
-            LIMIT $1
+            LIMIT $2
             OFFSET 1
         """
-        history_titles: list[str] = [r for (r,) in await self.bot.pool.fetch(query, number)]
+        history_titles: list[str] = [r for (r,) in await self.bot.pool.fetch(query, ctx.broadcaster.id, number)]
         if len(history_titles):
             for count, saved_title in enumerate(history_titles, start=1):
                 await ctx.send(f"{count}. {saved_title}")
@@ -201,33 +211,34 @@ class ChannelManagement(IrenesComponent):
         # assert channel
 
         now = datetime.datetime.now(datetime.UTC)
+        tracked = self.tracked[update.broadcaster.id]
         # time check is needed so we don't repeat notif that comes from !game !title commands.
 
-        if self.game_tracked != update.category_name and (now - self.game_updated_dt).seconds > 15:
+        if tracked.game_tracked != update.category_name and (now - tracked.game_updated_dt).seconds > 15:
             await update.broadcaster.send_message(
                 sender=const.UserID.Bot,
                 message=f'{const.STV.donkDetective} Game was changed to "{update.category_name}"',
             )
 
-        if self.title_tracked != update.title and (now - self.title_updated_dt).seconds > 15:
+        if tracked.title_tracked != update.title and (now - tracked.title_updated_dt).seconds > 15:
             await update.broadcaster.send_message(
                 sender=const.UserID.Bot,
                 message=f'{const.STV.DankThink} Title was changed to "{update.title}"',
             )
 
-        if self.title_tracked != update.title:
+        if tracked.title_tracked != update.title:
             # we need to record the title into the database
             query = """
                 INSERT INTO ttv_stream_titles
-                (title, edit_time)
-                VALUES ($1, $2)
-                ON CONFLICT (title) DO
+                (title, edit_time, broadcaster_id)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (broadcaster_id, title) DO
                     UPDATE SET edit_time = $2;
             """
-            await self.bot.pool.execute(query, update.title, now)
+            await self.bot.pool.execute(query, update.title, now, update.broadcaster.id)
 
-        self.game_tracked = update.category_name
-        self.title_tracked = update.title
+        tracked.game_tracked = update.category_name
+        tracked.title_tracked = update.title
 
     @commands.Component.listener(name="stream_offline")
     async def clear_the_database(self, _: twitchio.StreamOffline) -> None:
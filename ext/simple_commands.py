@@ -293,7 +293,7 @@ class DefaultCommands(IrenesComponent):
     @commands.command()
     async def uptime(self, ctx: commands.Context) -> None:
         """Get stream uptime."""
-        stream = await self.bot.irene_stream()
+        stream = await self.bot.fetch_stream(ctx.broadcaster.id)
         if stream is None:
             await ctx.send(f"Stream is offline {const.BTTV.Offline}")
         else:
@@ -3,21 +3,51 @@ from __future__ import annotations
 import asyncio
 import itertools
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, override
 
 from twitchio.ext import commands
 
-from bot import IrenesComponent, irenes_loop
+from bot import IrenesComponent, PerChannel, irenes_loop, message_matcher
 from utils import const
 
 if TYPE_CHECKING:
-    import twitchio
+    from bot import ChatLine, IrenesBot
 
-    from bot import IrenesBot
+
+class ChannelTimer:
+    """Timer state of one channel: its own lines count and its own timer task."""
+
+    def __init__(self, component: Timers, broadcaster_id: str) -> None:
+        self.component: Timers = component
+        self.bot: IrenesBot = component.bot
+        self.broadcaster_id: str = broadcaster_id
+        self.lines_count: int = 0
+
+    @irenes_loop(count=1)
+    async def timer_task(self) -> None:
+        """Task to send periodic messages into the channel on timer."""
+        await asyncio.sleep(10 * 60)
+        messages = self.component.messages.copy()
+        random.shuffle(messages)
+
+        # refresh lines count so it only counts messages from the current stream.
+        self.lines_count = 0
+        for text in itertools.cycle(messages):
+            while self.lines_count < 99:
+                await asyncio.sleep(100)
+
+            self.lines_count = 0
+            await self.component.deliver(text, broadcaster_id=self.broadcaster_id)
+            minutes_to_sleep = 69 + random.randint(1, 21)
+            await asyncio.sleep(minutes_to_sleep * 60)
+
+    @timer_task.before_loop
+    async def timer_task_before_loop(self) -> None:
+        await self.bot.wait_until_ready()
 
 
 class Timers(IrenesComponent):
-    """Periodic messages/announcements in Irene's channel."""
+    """Periodic messages/announcements in channels that have timers enabled."""
 
     def __init__(self, bot: IrenesBot) -> None:
         super().__init__(bot)
@@ -40,49 +70,37 @@ class Timers(IrenesComponent):
             # "Discord discord.gg/K8FuDeP",
             # "if you have nothing to do Sadge you can try !randompasta. Maybe you'll like it Okayge",
         ]
-        self.lines_count: int = 0
+        self.timers: PerChannel[ChannelTimer] = PerChannel(lambda broadcaster_id: ChannelTimer(self, broadcaster_id))
 
-    @commands.Component.listener(name="irene_online")
-    async def stream_online_start_the_task(self) -> None:
-        """Start the timer task when stream goes online."""
-        if not self.timer_task.is_running():
-            self.timer_task.start()
+    @override
+    async def component_teardown(self) -> None:
+        for timer in self.timers.values():
+            timer.timer_task.cancel()
 
-    @commands.Component.listener(name="irene_offline")
-    async def stream_offline_cancel_the_task(self) -> None:
-        """Cancel the timer task when stream goes offline."""
-        self.timer_task.cancel()
+    def has_timers(self, broadcaster_id: str) -> bool:
+        channel = self.bot.channels.get(broadcaster_id)
+        return channel is not None and channel.timers
 
-    @commands.Component.listener(name="message")
-    async def count_messages(self, message: twitchio.ChatMessage) -> None:
-        """Count messages between timers so the bot doesn't spam fill up an empty chat."""
-        if message.chatter.name in const.Bots:
-            # do not count messages from known bot accounts
+    @commands.Component.listener(name="channel_online")
+    async def stream_online_start_the_task(self, broadcaster_id: str) -> None:
+        """Start the timer task when stream goes online."""
+        if not self.has_timers(broadcaster_id):
             return
+        timer = self.timers[broadcaster_id]
+        if not timer.timer_task.is_running():
+            timer.timer_task.start()
 
-        self.lines_count += 1
-
-    @irenes_loop(count=1)
-    async def timer_task(self) -> None:
-        """Task to send periodic messages into irene's channel on timer."""
-        await asyncio.sleep(10 * 60)
-        messages = self.messages.copy()
-        random.shuffle(messages)
-
-        # refresh lines count so it only counts messages from the current stream.
-        self.lines_count = 0
-        for text in itertools.cycle(messages):
-            while self.lines_count < 99:
-                await asyncio.sleep(100)
-
-            self.lines_count = 0
-            await self.deliver(text)
-            minutes_to_sleep = 69 + random.randint(1, 21)
-            await asyncio.sleep(minutes_to_sleep * 60)
+    @commands.Component.listener(name="channel_offline")
+    async def stream_offline_cancel_the_task(self, broadcaster_id: str) -> None:
+        """Cancel the timer task when stream goes offline."""
+        if timer := self.timers.get(broadcaster_id):
+            timer.timer_task.cancel()
 
-    @timer_task.before_loop
-    async def timer_task_before_loop(self) -> None:
-        await self.bot.wait_until_ready()
+    @message_matcher()  # do not count messages from known bot accounts
+    async def count_messages(self, line: ChatLine) -> None:
+        """Count messages between timers so the bot doesn't spam fill up an empty chat."""
+        if self.has_timers(line.broadcaster_id):
+            self.timers[line.broadcaster_id].lines_count += 1
 
 
 async def setup(bot: IrenesBot) -> None:
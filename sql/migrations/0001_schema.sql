@@ -0,0 +1,128 @@
+-- Baseline schema (it used to be `sql/schema.sql`), written to be safe to run against an existing database.
+-- Do not edit migrations once they are applied - add a new numbered file instead (see `utils/migrations.py`).
+
+-- Table names here should start with `ttv_` because I'm using a shared database
+-- with my discord bot (so they both have access to the same data, i.e. my dota match history).
+-- So in order to differentiate - put `ttv_` prefix
+
+-- channels the bot serves together with their configuration (see `bot/channels.py`)
+CREATE TABLE IF NOT EXISTS ttv_channels (
+    broadcaster_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+
+    timers BOOLEAN DEFAULT FALSE,
+    keywords BOOLEAN DEFAULT TRUE
+);
+
+INSERT INTO ttv_channels (broadcaster_id, name, timers, keywords)
+VALUES ('180499648', 'irene_adler__', TRUE, TRUE)
+ON CONFLICT (broadcaster_id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS ttv_chat_commands (
+    command_name TEXT NOT NULL,
+    content TEXT NOT NULL,
+    streamer_id TEXT NOT NULL,
+
+    PRIMARY KEY (streamer_id, command_name)
+);
+
+CREATE TABLE IF NOT EXISTS ttv_counters (
+    name TEXT NOT NULL PRIMARY KEY,
+    value BIGINT DEFAULT (0),
+
+    -- chat counters (`!counter add`): messages in `broadcaster_id` channel matching `trigger` regex increment the value
+    broadcaster_id TEXT,
+    trigger TEXT,
+    milestone_step INT DEFAULT (1000)
+);
+
+ALTER TABLE ttv_counters ADD COLUMN IF NOT EXISTS broadcaster_id TEXT;
+ALTER TABLE ttv_counters ADD COLUMN IF NOT EXISTS trigger TEXT;
+ALTER TABLE ttv_counters ADD COLUMN IF NOT EXISTS milestone_step INT DEFAULT (1000);
+
+-- erm counter used to be hard-coded in the bot
+INSERT INTO ttv_counters (name, broadcaster_id, trigger, milestone_step)
+VALUES ('erm', '180499648', '\bErm\b', 1000)
+ON CONFLICT (name) DO
+    UPDATE SET broadcaster_id = excluded.broadcaster_id, trigger = excluded.trigger
+    WHERE ttv_counters.trigger IS NULL;
+
+CREATE TABLE IF NOT EXISTS ttv_first_redeems (
+    user_id TEXT PRIMARY KEY,
+    user_name TEXT NOT NULL,
+    first_times BIGINT DEFAULT (1)
+);
+
+CREATE TABLE IF NOT EXISTS ttv_dota_streamers (
+    account_id BIGINT PRIMARY KEY,
+    twitch_id TEXT NOT NULL,
+
+    twitch_name TEXT NOT NULL,
+
+    mmr INT DEFAULT (0),
+    medal TEXT DEFAULT 'Unknown'
+);
+
+CREATE TABLE IF NOT EXISTS ttv_dota_matches (
+    match_id BIGINT NOT NULL,
+    account_id BIGINT NOT NULL,
+
+    PRIMARY KEY (match_id, account_id),
+
+    hero_id INT NOT NULL,
+    start_time TIMESTAMPTZ DEFAULT (NOW() at time zone 'utc'),
+    -- duration INTERVAL NOT NULL,
+    -- kda TEXT NOT NULL,
+    lobby_type INT NOT NULL,
+    game_mode INT NOT NULL,
+    team INT,
+    
+    outcome INT NOT NULL,
+
+    CONSTRAINT fk_account
+        FOREIGN KEY (account_id)
+            REFERENCES ttv_dota_streamers(account_id) ON DELETE CASCADE
+);
+
+-- newest match of the account synced into `ttv_dota_matches` (see `ext/dota/history.py`)
+CREATE TABLE IF NOT EXISTS ttv_dota_history_cursors (
+    account_id BIGINT PRIMARY KEY,
+    last_match_id BIGINT NOT NULL,
+    synced_at TIMESTAMPTZ DEFAULT (NOW() at time zone 'utc'),
+
+    CONSTRAINT fk_account
+        FOREIGN KEY (account_id)
+            REFERENCES ttv_dota_streamers(account_id) ON DELETE CASCADE
+);
+
+-- win/loss aggregates of gaming sessions for `!wl` command (see `ext/dota/sessions.py`)
+CREATE TABLE IF NOT EXISTS ttv_dota_sessions (
+    account_id BIGINT NOT NULL,
+    session_start TIMESTAMPTZ NOT NULL,
+    category INT NOT NULL,
+
+    PRIMARY KEY (account_id, session_start, category),
+
+    last_match_time TIMESTAMPTZ NOT NULL,
+    wins INT NOT NULL DEFAULT (0),
+    losses INT NOT NULL DEFAULT (0),
+
+    CONSTRAINT fk_account
+        FOREIGN KEY (account_id)
+            REFERENCES ttv_dota_streamers(account_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS ttv_stream_titles (
+    title TEXT NOT NULL PRIMARY KEY,
+    edit_time TIMESTAMPTZ DEFAULT (NOW() at time zone 'utc'),
+    broadcaster_id TEXT NOT NULL DEFAULT ('180499648')
+);
+
+ALTER TABLE ttv_stream_titles ADD COLUMN IF NOT EXISTS broadcaster_id TEXT NOT NULL DEFAULT ('180499648');
+
+
+CREATE TABLE IF NOT EXISTS ttv_tokens (
+    user_id TEXT PRIMARY KEY, 
+    token TEXT NOT NULL, 
+    refresh TEXT NOT NULL
+);
\ No newline at end of file
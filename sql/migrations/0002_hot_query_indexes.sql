@@ -0,0 +1,17 @@
+-- Indexes for the hot access paths that used to scan the whole table.
+
+-- gaming session detection walks the account's matches by time (see `ext/dota/sessions.py`)
+CREATE INDEX IF NOT EXISTS ix_ttv_dota_matches_account_id_start_time
+    ON ttv_dota_matches (account_id, start_time DESC);
+
+-- `clean_up_the_database` task deletes matches older than the cutoff
+CREATE INDEX IF NOT EXISTS ix_ttv_dota_matches_start_time
+    ON ttv_dota_matches (start_time);
+
+-- `!title restore` and `!title history` read the channel's newest titles
+CREATE INDEX IF NOT EXISTS ix_ttv_stream_titles_broadcaster_id_edit_time
+    ON ttv_stream_titles (broadcaster_id, edit_time DESC);
+
+-- titles older than 30 days are deleted on `stream_offline`
+CREATE INDEX IF NOT EXISTS ix_ttv_stream_titles_edit_time
+    ON ttv_stream_titles (edit_time);
@@ -0,0 +1,4 @@
+-- Titles are saved per channel: the same title set in two channels is two rows,
+-- so one channel doesn't take it away from the other's `!title history`/`!title restore`.
+ALTER TABLE ttv_stream_titles DROP CONSTRAINT IF EXISTS ttv_stream_titles_pkey;
+ALTER TABLE ttv_stream_titles ADD CONSTRAINT ttv_stream_titles_pkey PRIMARY KEY (broadcaster_id, title);
@@ -0,0 +1,5 @@
+-- Channels opt in for `[debug]` messages about the streamer's rich presence and match data (see `ext/dota/commands.py`).
+ALTER TABLE ttv_dota_streamers ADD COLUMN IF NOT EXISTS debug BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Irene's channel always had them
+UPDATE ttv_dota_streamers SET debug = TRUE WHERE twitch_id = '180499648';
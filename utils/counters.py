@@ -0,0 +1,126 @@
+"""Counters.
+
+In-memory counters backed by `ttv_counters` table with write-behind flushing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, TypedDict
+
+from bot import irenes_loop
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from bot import IrenesBot
+
+    class CountersRow(TypedDict):
+        name: str
+        value: int
+
+
+__all__ = ("CounterService",)
+
+log = logging.getLogger(__name__)
+
+
+class CounterService:
+    """Write-behind counters.
+
+    Increments only touch memory, so chat spam of i.e. "Erm" costs zero database round-trips per message.
+    Aggregated deltas are flushed into `ttv_counters` in one query on an interval and on shutdown.
+
+    Since every increment goes through this object, milestone crossings are still detected exactly.
+    """
+
+    def __init__(self, bot: IrenesBot) -> None:
+        self.bot: IrenesBot = bot
+        self.values: dict[str, int] = {}
+        # name -> delta that is not in the database yet
+        self.pending: dict[str, int] = {}
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        """Load current values from the database."""
+        rows: list[CountersRow] = await self.bot.pool.fetch("SELECT name, value FROM ttv_counters")
+        for row in rows:
+            # increments that happened before loading are preserved via `pending`
+            self.values[row["name"]] = row["value"] + self.pending.get(row["name"], 0)
+
+    def get(self, name: str) -> int:
+        return self.values.get(name, 0)
+
+    def register(self, name: str, value: int = 0) -> None:
+        """Start tracking a counter that was just inserted into the database."""
+        self.values[name] = value
+
+    def discard(self, name: str) -> None:
+        """Forget the counter, including its deltas that are not flushed yet."""
+        self.values.pop(name, None)
+        self.pending.pop(name, None)
+
+    @contextlib.asynccontextmanager
+    async def flushing(self) -> AsyncGenerator[None, None]:
+        """Hold the flush lock, so no flush happens while counter rows are being created/deleted."""
+        async with self._flush_lock:
+            yield
+
+    def increment(self, name: str, amount: int = 1) -> tuple[int, int]:
+        """Increment the counter in memory.
+
+        Returns
+        -------
+        tuple[int, int]
+            Values before and after the increment.
+        """
+        before = self.values.get(name, 0)
+        after = self.values[name] = before + amount
+        self.pending[name] = self.pending.get(name, 0) + amount
+        return before, after
+
+    @staticmethod
+    def crossed_milestone(before: int, after: int, step: int) -> int | None:
+        """Get the milestone (multiple of `step`) crossed between `before` and `after` values, if any."""
+        if step > 0 and after // step > before // step:
+            return after // step * step
+        return None
+
+    async def flush(self) -> None:
+        """Write all pending deltas into the database in one round-trip."""
+        async with self._flush_lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, {}
+
+            query = """--sql
+                INSERT INTO ttv_counters (name, value)
+                SELECT * FROM unnest($1::text[], $2::bigint[])
+                ON CONFLICT (name) DO
+                    UPDATE SET value = ttv_counters.value + excluded.value;
+            """
+            try:
+                await self.bot.pool.execute(query, list(pending.keys()), list(pending.values()))
+            except BaseException:
+                # put deltas back so they are not lost (even if the flush got cancelled), the next flush retries them
+                for name, delta in pending.items():
+                    self.pending[name] = self.pending.get(name, 0) + delta
+                raise
+            log.debug("Flushed counters: %s", pending)
+
+    @irenes_loop(seconds=60)
+    async def flush_task(self) -> None:
+        """Task to periodically flush counters into the database."""
+        await self.flush()
+
+    def start(self) -> None:
+        self.flush_task.start()
+
+    async def close(self) -> None:
+        """Stop the flush task and write down whatever is left."""
+        # under the lock, so a flush in progress finishes its write instead of being cancelled midway
+        async with self._flush_lock:
+            self.flush_task.cancel()
+        await self.flush()
@@ -1,3 +1,48 @@
-from .cache import *
-from .dota2client import *
-from .pulsefire_clients import *
+"""Dota 2 related clients.
+
+Submodules are heavy (`steam`, `pulsefire`, `orjson`) so they are imported lazily on the first attribute access,
+i.e. `from utils.dota import OpenDotaClient` only imports `pulsefire_clients` and not the steam client.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .cache import *
+    from .dota2client import *
+    from .live_matches import *
+    from .profile_cards import *
+    from .pulsefire_clients import *
+
+__all__ = (
+    "Dota2Client",
+    "DotaKeyCache",
+    "LiveMatchPoller",
+    "OpenDotaClient",
+    "ProfileCardBatcher",
+    "SteamWebAPIClient",
+)
+
+# attribute name -> submodule it lives in, resolved in `__getattr__`
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "Dota2Client": ".dota2client",
+    "DotaKeyCache": ".cache",
+    "LiveMatchPoller": ".live_matches",
+    "OpenDotaClient": ".pulsefire_clients",
+    "ProfileCardBatcher": ".profile_cards",
+    "SteamWebAPIClient": ".pulsefire_clients",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg) from None
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # so the next access doesn't go through `__getattr__`
+    return value
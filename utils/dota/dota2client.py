@@ -15,6 +15,8 @@ except ImportError:
     import config
 
 if TYPE_CHECKING:
+    from steam import User
+
     from bot import IrenesBot
 
 log = logging.getLogger(__name__)
@@ -41,3 +43,9 @@ class Dota2Client(Client):
         log.info("Dota 2 Client: Ready - Successfully %s", self.user.name)
         await self.wait_until_gc_ready()
         log.info("Dota 2 Game Coordinator: Ready")
+
+    @override
+    async def on_user_update(self, before: User, after: User, /) -> None:
+        # forward rich presence changes to the twitch bot so `ext.dota` reacts to them right away
+        if before.rich_presence != after.rich_presence:
+            self.bot.dispatch("steam_rich_presence_update", after)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from bot import irenes_loop
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from steam.ext.dota2 import LiveMatch
+
+    from bot import IrenesBot
+
+    from .schemas import SteamWebAPI
+
+
+__all__ = ("LiveMatchPoller",)
+
+log = logging.getLogger(__name__)
+
+
+class LiveMatchSubscriptions[K, V]:
+    """Callbacks interested in live data of some keys (lobby ids or server steam ids)."""
+
+    def __init__(self, kind: str, *, max_misses: int) -> None:
+        self.kind: str = kind
+        self.max_misses: int = max_misses
+        self.callbacks: dict[K, list[Callable[[V], Any]]] = {}
+        self.misses: dict[K, int] = {}  # key -> polls in a row that didn't have data for it
+
+    def __bool__(self) -> bool:
+        return bool(self.callbacks)
+
+    def add(self, key: K, callback: Callable[[V], Any]) -> None:
+        self.callbacks.setdefault(key, []).append(callback)
+
+    def discard(self, key: K, callback: Callable[[V], Any]) -> None:
+        callbacks = self.callbacks.get(key)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self.callbacks[key]
+                self.misses.pop(key, None)
+
+    def publish(self, data: dict[K, V]) -> None:
+        """Send fresh data to the callbacks. Keys without data for `max_misses` polls in a row are dropped."""
+        for key, callbacks in list(self.callbacks.items()):
+            value = data.get(key)
+            if value is None:
+                self.misses[key] = self.misses.get(key, 0) + 1
+                if self.misses[key] >= self.max_misses:
+                    log.warning("Giving up on %s %s: no data for %s polls in a row.", self.kind, key, self.misses[key])
+                    del self.callbacks[key], self.misses[key]
+                continue
+
+            self.misses.pop(key, None)
+            # callbacks are allowed to unsubscribe themselves
+            for callback in list(callbacks):
+                try:
+                    callback(value)
+                except Exception:
+                    log.exception("Callback %s for %s %s failed.", callback.__qualname__, self.kind, key)
+
+
+class LiveMatchPoller:
+    """Poll live matches data for all active matches at once.
+
+    Instead of every match object polling its own data in several loops, matches `watch_lobby`/`watch_server` here
+    and every tick of `poll`:
+    * all watched lobbies are fetched from Game Coordinator in a single `live_matches` call;
+    * all watched servers are fetched from Steam Web API's real time stats concurrently;
+    * the results are published to every interested match.
+
+    The task only runs while something is watched. Calling `poll()` directly refreshes the data right away.
+    """
+
+    def __init__(self, bot: IrenesBot, *, max_misses: int = 30, timeout: float = 10.0) -> None:
+        self.bot: IrenesBot = bot
+        self.timeout: float = timeout
+        self.lobbies: LiveMatchSubscriptions[int, LiveMatch] = LiveMatchSubscriptions(
+            "lobby", max_misses=max_misses
+        )
+        self.servers: LiveMatchSubscriptions[int, SteamWebAPI.RealtimeStats] = LiveMatchSubscriptions(
+            "server", max_misses=max_misses
+        )
+
+    def _ensure_polling(self) -> None:
+        if not self.poll.is_running():
+            self.poll.start()
+
+    def watch_lobby(self, lobby_id: int, callback: Callable[[LiveMatch], Any]) -> None:
+        """Get `LiveMatch` of the lobby into `callback` every poll."""
+        self.lobbies.add(lobby_id, callback)
+        self._ensure_polling()
+
+    def unwatch_lobby(self, lobby_id: int, callback: Callable[[LiveMatch], Any]) -> None:
+        self.lobbies.discard(lobby_id, callback)
+
+    def watch_server(self, server_steam_id: int, callback: Callable[[SteamWebAPI.RealtimeStats], Any]) -> None:
+        """Get real time stats of the server into `callback` every poll."""
+        self.servers.add(server_steam_id, callback)
+        self._ensure_polling()
+
+    def unwatch_server(self, server_steam_id: int, callback: Callable[[SteamWebAPI.RealtimeStats], Any]) -> None:
+        self.servers.discard(server_steam_id, callback)
+
+    async def fetch_live_matches(self, lobby_ids: list[int]) -> dict[int, LiveMatch]:
+        if not lobby_ids:
+            return {}
+        try:
+            async with asyncio.timeout(self.timeout):
+                matches = await self.bot.dota.live_matches(lobby_ids=lobby_ids)
+        except Exception as exc:
+            log.warning("Failed to fetch live matches for lobbies %s: %r", lobby_ids, exc)
+            return {}
+        return {match.lobby_id: match for match in matches}
+
+    async def fetch_real_time_stats(self, server_steam_ids: list[int]) -> dict[int, SteamWebAPI.RealtimeStats]:
+        async def fetch(server_steam_id: int) -> SteamWebAPI.RealtimeStats:
+            async with asyncio.timeout(self.timeout):
+                return await self.bot.steam_web_api.get_real_time_stats(server_steam_id)
+
+        results = await asyncio.gather(*(fetch(server) for server in server_steam_ids), return_exceptions=True)
+        stats: dict[int, SteamWebAPI.RealtimeStats] = {}
+        for server_steam_id, result in zip(server_steam_ids, results, strict=True):
+            if isinstance(result, BaseException):
+                log.warning("Failed to fetch real time stats for server %s: %r", server_steam_id, result)
+            else:
+                stats[server_steam_id] = result
+        return stats
+
+    @irenes_loop(seconds=10)
+    async def poll(self) -> None:
+        lobby_ids, server_steam_ids = list(self.lobbies.callbacks), list(self.servers.callbacks)
+        start = perf_counter()
+        live_matches, real_time_stats = await asyncio.gather(
+            self.fetch_live_matches(lobby_ids),
+            self.fetch_real_time_stats(server_steam_ids),
+        )
+        log.debug(
+            "Polled %s/%s lobbies and %s/%s servers in %.3fs",
+            len(live_matches),
+            len(lobby_ids),
+            len(real_time_stats),
+            len(server_steam_ids),
+            perf_counter() - start,
+        )
+
+        self.lobbies.publish(live_matches)
+        self.servers.publish(real_time_stats)
+        if not self.lobbies and not self.servers:
+            self.poll.stop()
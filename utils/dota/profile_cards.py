@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any
+
+from bot import irenes_loop, metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from steam.ext.dota2 import ProfileCard
+
+    from bot import IrenesBot
+
+    type ProfileCardCallback = Callable[[ProfileCard], Any]
+
+
+__all__ = (
+    "ProfileCardBatcher",
+    "TTLCache",
+)
+
+log = logging.getLogger(__name__)
+
+
+class TTLCache[K, V]:
+    """Least recently used cache which entries also expire `ttl` seconds after they were set."""
+
+    def __init__(self, *, maxsize: int = 512, ttl: float = 2 * 60 * 60) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self._data: collections.OrderedDict[K, tuple[float, V]] = collections.OrderedDict()  # key -> (expires, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            return None
+        if expires < monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class ProfileCardBatcher:
+    """Fetch Dota 2 profile cards for many accounts at once.
+
+    A live match needs profile cards of all 10 players. Instead of every player polling Game Coordinator on its own,
+    players `request` their profile cards here and every tick of `fetch_pending`:
+    * all pending accounts are fetched together with at most `concurrency` requests in flight;
+    * results are fanned out to the callbacks of every waiter of the account;
+    * only the failed accounts stay pending for the next tick (up to `max_attempts` ticks).
+
+    The task only runs while there is something pending.
+    Fetched cards are kept in `cache` for a while, so party members and regulars from back-to-back matches
+    are ready instantly without asking Game Coordinator again.
+    """
+
+    def __init__(
+        self,
+        bot: IrenesBot,
+        *,
+        concurrency: int = 5,
+        max_attempts: int = 12,
+        timeout: float = 10.0,
+    ) -> None:
+        self.bot: IrenesBot = bot
+        self.max_attempts: int = max_attempts
+        self.timeout: float = timeout
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+        self.pending: dict[int, list[ProfileCardCallback]] = {}  # account_id -> callbacks waiting for the card
+        self.attempts: dict[int, int] = {}  # account_id -> failed attempts so far
+        self.cache: TTLCache[int, ProfileCard] = TTLCache()
+
+    def request(self, account_id: int, callback: ProfileCardCallback) -> None:
+        """Ask for the account's profile card, `callback` is called with it once it's fetched.
+
+        If the card is cached then `callback` is called right away.
+        """
+        if (profile_card := self.cache.get(account_id)) is not None:
+            metrics.counter("irenesbot_profile_card_cache_total", result="hit").inc()
+            callback(profile_card)
+            return
+
+        metrics.counter("irenesbot_profile_card_cache_total", result="miss").inc()
+        self.pending.setdefault(account_id, []).append(callback)
+        self.attempts.setdefault(account_id, 0)
+        if not self.fetch_pending.is_running():
+            # the first iteration runs on the next event loop cycle,
+            # so players created in one go (i.e. the whole match) end up in the same batch
+            self.fetch_pending.start()
+
+    def discard(self, account_id: int, callback: ProfileCardCallback) -> None:
+        """Withdraw the request, i.e. the match is over and nobody needs the data anymore."""
+        callbacks = self.pending.get(account_id)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self.pending[account_id]
+                del self.attempts[account_id]
+
+    async def _fetch(self, account_id: int) -> ProfileCard:
+        async with self._semaphore, asyncio.timeout(self.timeout):
+            partial_user = self.bot.dota.instantiate_partial_user(account_id)
+            return await partial_user.dota2_profile_card()
+
+    @irenes_loop(seconds=5)
+    async def fetch_pending(self) -> None:
+        account_ids = list(self.pending)
+        start = perf_counter()
+        results = await asyncio.gather(*(self._fetch(account_id) for account_id in account_ids), return_exceptions=True)
+
+        failed = 0
+        for account_id, result in zip(account_ids, results, strict=True):
+            if account_id not in self.pending:
+                # discarded while the request was in flight
+                continue
+
+            if isinstance(result, BaseException):
+                failed += 1
+                self.attempts[account_id] += 1
+                if self.attempts[account_id] >= self.max_attempts:
+                    log.warning("Giving up on profile card for %s: %r", account_id, result)
+                    del self.pending[account_id], self.attempts[account_id]
+                continue
+
+            self.cache.set(account_id, result)
+            callbacks = self.pending.pop(account_id)
+            del self.attempts[account_id]
+            for callback in callbacks:
+                callback(result)
+
+        log.debug(
+            "Fetched %s/%s profile cards in %.3fs", len(account_ids) - failed, len(account_ids), perf_counter() - start
+        )
+        if not self.pending:
+            self.fetch_pending.stop()
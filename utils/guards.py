@@ -30,9 +30,9 @@ def is_vps() -> Any:
 
 
 def is_online() -> Any:
-    """Allow the command to be completed only when Irene's stream is online."""
+    """Allow the command to be completed only when the channel's stream is online."""
 
     async def predicate(ctx: commands.Context[IrenesBot]) -> bool:
-        return ctx.bot.irene_online
+        return ctx.bot.is_online(ctx.broadcaster.id)
 
     return commands.guard(predicate)
@@ -0,0 +1,161 @@
+"""Matchers.
+
+Utilities to look up many patterns in chat text at once
+so the per-message cost doesn't grow with the amount of patterns we have registered.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+__all__ = (
+    "MultiPatternMatcher",
+    "PrefixTrie",
+)
+
+
+class MultiPatternMatcher[K]:
+    """Many patterns compiled into one regex alternation, scanned in a single pass.
+
+    Each key gets its own named group, so one `finditer` over the text tells us
+    which keys were hit, no matter how many keys/aliases are registered.
+
+    Example
+    -------
+    ```py
+    matcher: MultiPatternMatcher[str] = MultiPatternMatcher()
+    matcher.add_words("pog", ["Pog", "PogU"])
+    matcher.add_regex("erm", r"\\bErm\\b")
+    matcher.compile()
+    matcher.matches("PogU Erm")  # ["pog", "erm"]
+    ```
+
+    Notes
+    -----
+    * matching is non-overlapping, same as `re.finditer`.
+    * regexes added via `add_regex` should not use their own named groups or numbered backreferences.
+    """
+
+    def __init__(self) -> None:
+        self._sources: list[str] = []
+        self._keys: dict[str, K] = {}  # group name -> key
+        self._pattern: re.Pattern[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add_words(self, key: K, words: Iterable[str], *, ignore_case: bool = False) -> None:
+        """Register literal words/phrases for `key`. Words are matched as whole words."""
+        # longest first so "PogU" is preferred over "Pog"
+        escaped = [re.escape(word) for word in sorted(words, key=len, reverse=True)]
+        self.add_regex(key, r"\b(?:" + "|".join(escaped) + r")\b", ignore_case=ignore_case)
+
+    def add_regex(self, key: K, pattern: str, *, ignore_case: bool = False) -> None:
+        """Register a raw regex for `key`."""
+        group = f"k{len(self._sources)}"
+        flags = "(?i:{})" if ignore_case else "(?:{})"
+        self._sources.append(f"(?P<{group}>{flags.format(pattern)})")
+        self._keys[group] = key
+        self._pattern = None
+
+    def compile(self) -> None:
+        """Compile all registered patterns into one. Called lazily on the first scan if forgotten."""
+        # `(?!)` never matches - so an empty matcher is still a valid one
+        self._pattern = re.compile("|".join(self._sources) or "(?!)")
+
+    def clear(self) -> None:
+        self._sources.clear()
+        self._keys.clear()
+        self._pattern = None
+
+    def finditer(self, text: str) -> Iterator[tuple[K, re.Match[str]]]:
+        """Yield `(key, match)` for every match in the text."""
+        if self._pattern is None:
+            self.compile()
+        assert self._pattern is not None
+        for match in self._pattern.finditer(text):
+            assert match.lastgroup is not None
+            yield self._keys[match.lastgroup], match
+
+    def matches(self, text: str) -> list[K]:
+        """Get unique keys matched in the text (in order of the first appearance)."""
+        return list(dict.fromkeys(key for key, _ in self.finditer(text)))
+
+
+class _TrieNode[V]:
+    __slots__: tuple[str, ...] = ("children", "has_value", "value")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode[V]] = {}
+        self.has_value: bool = False
+        self.value: V | None = None
+
+
+class PrefixTrie[V]:
+    """Character trie to find the longest registered key that is a prefix of some text in O(len(text)).
+
+    Example
+    -------
+    ```py
+    trie: PrefixTrie[str] = PrefixTrie()
+    trie["a"] = "A response"
+    trie["abc"] = "ABC response"
+    trie.longest_prefix("abcdef")  # ("abc", "ABC response")
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._root: _TrieNode[V] = _TrieNode()
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __setitem__(self, key: str, value: V) -> None:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        if not node.has_value:
+            self._size += 1
+        node.has_value = True
+        node.value = value
+
+    def __delitem__(self, key: str) -> None:
+        # remember the path so we can prune branches that became empty
+        path: list[tuple[_TrieNode[V], str]] = []
+        node = self._root
+        for char in key:
+            path.append((node, char))
+            try:
+                node = node.children[char]
+            except KeyError:
+                raise KeyError(key) from None
+        if not node.has_value:
+            raise KeyError(key)
+
+        node.has_value = False
+        node.value = None
+        self._size -= 1
+
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.has_value or child.children:
+                break
+            del parent.children[char]
+
+    def longest_prefix(self, text: str) -> tuple[str, V] | None:
+        """Get `(key, value)` for the longest key that `text` starts with."""
+        node = self._root
+        found: tuple[str, V] | None = None
+        for index, char in enumerate(text):
+            next_node = node.children.get(char)
+            if next_node is None:
+                break
+            node = next_node
+            if node.has_value:
+                found = (text[: index + 1], node.value)  # type: ignore[assignment] # has_value guarantees V
+        return found
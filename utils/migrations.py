@@ -0,0 +1,110 @@
+"""Database Migrations.
+
+The schema is described by numbered SQL files in `sql/migrations/`, i.e. `0002_hot_query_indexes.sql`.
+Every migration is applied once, in order of its version, in its own transaction
+and the version is recorded in `ttv_schema_migrations` together with the migration.
+So schema changes (new tables, columns, indexes) ship as a new file and get applied on the next bot start
+or with `python . migrate`.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+__all__ = (
+    "Migration",
+    "apply_migrations",
+    "discover_migrations",
+    "pending_migrations",
+)
+
+log = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = Path(__file__).parent.parent / "sql" / "migrations"
+MIGRATION_FILE_REGEX = re.compile(r"(?P<version>\d+)_(?P<name>\w+)\.sql")
+# arbitrary key for `pg_advisory_lock` so two bot instances never migrate at the same time
+MIGRATIONS_LOCK_KEY = 180499648
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+    def read(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+def discover_migrations(path: Path = MIGRATIONS_PATH) -> list[Migration]:
+    """Get all migrations from the folder, sorted by version."""
+    migrations: dict[int, Migration] = {}
+    for file in path.glob("*.sql"):
+        if not (match := MIGRATION_FILE_REGEX.fullmatch(file.name)):
+            msg = f"Migration file name {file.name!r} doesn't follow `NNNN_description.sql` format."
+            raise ValueError(msg)
+
+        version = int(match.group("version"))
+        if version in migrations:
+            msg = f"Migrations {migrations[version].path.name!r} and {file.name!r} have the same version."
+            raise ValueError(msg)
+        migrations[version] = Migration(version, match.group("name"), file)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+async def ensure_migrations_table(connection: asyncpg.Connection[asyncpg.Record]) -> None:
+    query = """
+        CREATE TABLE IF NOT EXISTS ttv_schema_migrations (
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ DEFAULT (NOW() at time zone 'utc')
+        )
+    """
+    await connection.execute(query)
+
+
+async def pending_migrations(connection: asyncpg.Connection[asyncpg.Record]) -> list[Migration]:
+    """Get migrations that are not applied to the database yet."""
+    await ensure_migrations_table(connection)
+    applied: set[int] = {row["version"] for row in await connection.fetch("SELECT version FROM ttv_schema_migrations")}
+    return [migration for migration in discover_migrations() if migration.version not in applied]
+
+
+async def apply_migrations(pool: asyncpg.Pool[asyncpg.Record], *, dry_run: bool = False) -> list[Migration]:
+    """Apply all pending migrations.
+
+    Parameters
+    ----------
+    dry_run
+        Only find out what is pending without applying anything.
+
+    Returns
+    -------
+    list[Migration]
+        Migrations that were applied (or would be applied with `dry_run`).
+    """
+    async with pool.acquire() as connection:
+        await connection.execute("SELECT pg_advisory_lock($1)", MIGRATIONS_LOCK_KEY)
+        try:
+            pending = await pending_migrations(connection)
+            if dry_run:
+                return pending
+
+            for migration in pending:
+                start = perf_counter()
+                # a failed migration is rolled back as a whole and stops the rest from being applied
+                async with connection.transaction():
+                    await connection.execute(migration.read())
+                    query = "INSERT INTO ttv_schema_migrations (version, name) VALUES ($1, $2)"
+                    await connection.execute(query, migration.version, migration.name)
+                log.info("Applied migration %s in %.3fs.", migration.path.name, perf_counter() - start)
+            return pending
+        finally:
+            await connection.execute("SELECT pg_advisory_unlock($1)", MIGRATIONS_LOCK_KEY)